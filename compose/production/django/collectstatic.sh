@@ -0,0 +1,9 @@
+#!/bin/sh
+
+set -o errexit
+set -o pipefail
+set -o nounset
+
+
+# Run once per release, e.g. docker-compose run --rm django /collectstatic.sh
+python /app/manage.py collectstatic --noinput
@@ -5,5 +5,5 @@ set -o pipefail
 set -o nounset
 
 
-python /app/manage.py collectstatic --noinput
-/usr/local/bin/gunicorn config.wsgi -b 0.0.0.0:5000 --chdir=/app
+# static files are uploaded once per release by /collectstatic.sh, not on every start
+exec /usr/local/bin/gunicorn config.wsgi -c /app/config/gunicorn.py --chdir=/app
@@ -0,0 +1,75 @@
+"""
+Gunicorn runtime profile, used as `gunicorn -c config/gunicorn.py config.wsgi`.
+
+Everything is read from the environment so one image serves every profile:
+
+GUNICORN_WORKER_CLASS  sync, gthread (default) or gevent
+GUNICORN_WORKERS       worker processes, default derived from the CPU count
+GUNICORN_THREADS       threads per gthread worker
+GUNICORN_WORKER_CONNECTIONS  concurrent greenlets per gevent worker
+GUNICORN_PRELOAD       import the app once in the master, default on except for gevent
+GUNICORN_TIMEOUT, GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER
+
+Django opens one database connection per thread, and under gevent per
+greenlet, so workers * threads (or worker_connections) is the peak number
+of database connections per container. Run behind pgbouncer (pgbouncer.yml)
+when that exceeds what Postgres allows.
+"""
+import multiprocessing
+import os
+import random
+
+
+def env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+cpus = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    # one process per core, concurrency comes from greenlets
+    workers = env_int('GUNICORN_WORKERS', cpus)
+elif worker_class == 'gthread':
+    workers = env_int('GUNICORN_WORKERS', cpus + 1)
+else:
+    workers = env_int('GUNICORN_WORKERS', cpus * 2 + 1)
+# gunicorn turns a sync worker into gthread whenever threads > 1, so only
+# the gthread profile reads GUNICORN_THREADS
+threads = env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+worker_connections = env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# recycle workers to bound slow memory growth, staggered so they do not all
+# restart at once
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# gevent patches the standard library in each worker, after a preloaded app
+# would already have been imported unpatched
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0' if worker_class == 'gevent' else '1') == '1'
+
+# the heartbeat file lives in memory instead of the container's overlay filesystem
+worker_tmp_dir = '/dev/shm'
+accesslog = '-'
+
+
+def pre_fork(server, worker):
+    if not preload_app:
+        return
+    # never hand a socket opened in the master to a worker: closing it there
+    # would end the master's session for every other worker too
+    from django.db import connections
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    # every worker would otherwise draw the same sample sequence
+    random.seed()
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
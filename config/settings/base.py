@@ -7,6 +7,8 @@ https://docs.djangoproject.com/en/dev/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/dev/ref/settings/
 """
+import datetime
+
 import environ
 
 ROOT_DIR = environ.Path(__file__) - 3  # (walkup_law/config/settings/base.py - 3 = walkup_law/)
@@ -68,6 +70,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 # ------------------------------------------------------------------------------
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'walkup_law.walkup_law.middleware.QueryInstrumentationMiddleware',
+    'walkup_law.walkup_law.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -121,8 +125,34 @@ DATABASES = {
     'default': env.db('DATABASE_URL'),
 }
 
+# Fallback for views without a transaction policy; app views declare one with
+# @read_only or @write from walkup_law/walkup_law/decorators.py
 DATABASES['default']['ATOMIC_REQUESTS'] = True
 
+# Read replicas, see walkup_law/walkup_law/routers.py. Tests mirror them to
+# the default database.
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    alias = 'replica{}'.format(index)
+    DATABASES[alias] = env.db_url_config(replica_url)
+    DATABASES[alias].setdefault('OPTIONS', {})['connect_timeout'] = 2
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['walkup_law.walkup_law.routers.ReplicaRouter']
+
+# 'transaction' when connecting through pgbouncer in transaction pooling
+# mode, see walkup_law/walkup_law/db.py
+DATABASE_POOL_MODE = env('DATABASE_POOL_MODE', default='')
+if DATABASE_POOL_MODE == 'transaction':
+    for database in DATABASES.values():
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+# ping persistent connections at most this often, 0 disables
+DATABASE_HEALTH_CHECK_INTERVAL = env.int('DATABASE_HEALTH_CHECK_INTERVAL', default=30)
+# reads of a client stay on the primary this long after it writes
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=5)
+REPLICA_HEALTH_CHECK_INTERVAL = env.int('REPLICA_HEALTH_CHECK_INTERVAL', default=10)
+REPLICA_MAX_LAG = env.int('REPLICA_MAX_LAG', default=30)
+
 
 # GENERAL CONFIGURATION
 # ------------------------------------------------------------------------------
@@ -286,6 +316,12 @@ else:
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+CELERYBEAT_SCHEDULE = {
+    'reconcile-stripe-charges': {
+        'task': 'walkup_law.users.tasks.reconcile_charges',
+        'schedule': datetime.timedelta(hours=1),
+    },
+}
 ########## END CELERY
 
 
@@ -298,9 +334,35 @@ ADMIN_URL = r'^admin/'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES':
-    ('rest_framework.authentication.TokenAuthentication',),
+    ('walkup_law.users.authentication.CachedTokenAuthentication',),
     'DEFAULT_PAGINATION_CLASS':
     'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 25
 }
 
+# Seconds a read-through catalog cache entry is kept, see walkup_law/walkup_law/cache.py
+READ_CACHE_TIMEOUT = env.int('READ_CACHE_TIMEOUT', default=300)
+# Seconds hit/miss counts are buffered in each process before reaching the cache
+COUNTER_FLUSH_INTERVAL = env.int('COUNTER_FLUSH_INTERVAL', default=10)
+
+
+# STRIPE
+# ------------------------------------------------------------------------------
+STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY', default='')
+# Webhook signatures are only verified when this is set
+STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET', default='')
+
+# Subscription entitlement cache, see walkup_law/users/entitlements.py
+ENTITLEMENT_LOCAL_CACHE_SIZE = env.int('ENTITLEMENT_LOCAL_CACHE_SIZE', default=10000)
+ENTITLEMENT_LOCAL_TTL = env.int('ENTITLEMENT_LOCAL_TTL', default=30)
+ENTITLEMENT_CACHE_TIMEOUT = env.int('ENTITLEMENT_CACHE_TIMEOUT', default=3600)
+
+# Token authentication cache, see walkup_law/users/authentication.py
+TOKEN_AUTH_LOCAL_CACHE_SIZE = env.int('TOKEN_AUTH_LOCAL_CACHE_SIZE', default=10000)
+TOKEN_AUTH_LOCAL_TTL = env.int('TOKEN_AUTH_LOCAL_TTL', default=30)
+TOKEN_AUTH_CACHE_TIMEOUT = env.int('TOKEN_AUTH_CACHE_TIMEOUT', default=3600)
+
+# Query instrumentation, see walkup_law/walkup_law/middleware.py
+QUERY_INSTRUMENTATION_SAMPLE_RATE = env.float('QUERY_INSTRUMENTATION_SAMPLE_RATE', default=1.0)
+# log when one request repeats a statement at least this many times
+QUERY_INSTRUMENTATION_DUPLICATE_LIMIT = env.int('QUERY_INSTRUMENTATION_DUPLICATE_LIMIT', default=10)
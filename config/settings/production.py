@@ -134,6 +134,9 @@ TEMPLATES[0]['OPTIONS']['loaders'] = [
 DATABASES['default'] = env.db('DATABASE_URL')
 DATABASES['default']['ATOMIC_REQUESTS'] = True
 DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)
+# Behind pgbouncer the persistent connections above are cheap client slots;
+# Postgres only sees pgbouncer's pool
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = DATABASE_POOL_MODE == 'transaction'
 
 # CACHING
 # ------------------------------------------------------------------------------
@@ -214,3 +217,8 @@ ADMIN_URL = env('DJANGO_ADMIN_URL')
 
 # Your production stuff: Below this line define 3rd party library settings
 # ------------------------------------------------------------------------------
+STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY')
+STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET')
+
+# instrument one request in a hundred
+QUERY_INSTRUMENTATION_SAMPLE_RATE = env.float('QUERY_INSTRUMENTATION_SAMPLE_RATE', default=0.01)
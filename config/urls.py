@@ -10,7 +10,7 @@ urlpatterns = [
     url(settings.ADMIN_URL, admin.site.urls),
 
     # User management
-
+    url(r'^users/', include('walkup_law.users.urls')),
 
     # Your stuff: custom urls includes go here
     url(r'^auth/', include('djoser.urls')),
@@ -0,0 +1,43 @@
+#!/bin/sh
+# Compare gunicorn runtime profiles on the read endpoints.
+# Needs a migrated database with data (manage.py createfixtures) and the
+# production requirements. Results are collected in gunicorn-profiles.json.
+# With DEBUG off the staff benchmark user is only created when asked for:
+# BENCHMARK_ARGS=--allow-create-user
+#
+#   DJANGO_SETTINGS_MODULE=config.settings.production utility/benchmark_gunicorn_profiles.sh
+
+set -o errexit
+set -o nounset
+
+cd "$(dirname "$0")/.."
+
+PORT=${PORT:-5001}
+CONCURRENCY=${CONCURRENCY:-32}
+OUTPUT=${OUTPUT:-gunicorn-profiles.json}
+BENCHMARK_ARGS=${BENCHMARK_ARGS:-}
+STARTUP_TIMEOUT=${STARTUP_TIMEOUT:-60}
+
+pid=
+# never leave a gunicorn behind, whichever way the script exits
+trap '[ -n "$pid" ] && kill $pid 2>/dev/null' EXIT
+
+for profile in sync gthread gevent; do
+    GUNICORN_WORKER_CLASS=$profile GUNICORN_BIND=127.0.0.1:$PORT \
+        gunicorn config.wsgi -c config/gunicorn.py --access-logfile /dev/null &
+    pid=$!
+    waited=0
+    until curl -sf --max-time 5 http://127.0.0.1:$PORT/walkup_law/health/ >/dev/null; do
+        if [ "$waited" -ge "$STARTUP_TIMEOUT" ] || ! kill -0 $pid 2>/dev/null; then
+            echo "gunicorn ($profile) did not become healthy within ${STARTUP_TIMEOUT}s" >&2
+            exit 1
+        fi
+        sleep 1
+        waited=$((waited + 1))
+    done
+    python manage.py benchmark_http --base-url http://127.0.0.1:$PORT --concurrency "$CONCURRENCY" \
+        --label "$profile" --output "$OUTPUT" $BENCHMARK_ARGS
+    kill $pid
+    wait $pid || true
+    pid=
+done
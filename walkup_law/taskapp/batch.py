@@ -0,0 +1,143 @@
+"""
+Chunked batch jobs on the Celery app.
+
+A job splits the primary key range of a model into fixed-size chunks and fans
+them out as a chord of process_chunk tasks; finish_batch runs when all are done.
+Job state lives in the database (models.py): the job row plus one BatchChunk
+row per finished chunk, so it survives cache eviction and restarts. That gives
+progress reporting and lets resume_batch re-dispatch only the unfinished
+chunks after a worker dies. Chunk tasks are acks_late so the broker also
+redelivers a chunk whose worker was killed.
+
+Handlers are registered with @batch_handler in an app's tasks.py, so workers
+import them through autodiscovery. A handler gets an inclusive (start, end) pk
+range and must be safe to run twice on the same range.
+"""
+from celery import chord
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from walkup_law.taskapp.celery import app
+from walkup_law.taskapp.models import BatchChunk, BatchJob
+
+_handlers = {}
+
+
+def batch_handler(name):
+    """
+    Register a chunk handler under name
+    :param name: handler name passed to start_batch
+    """
+    def register(func):
+        _handlers[name] = func
+        return func
+    return register
+
+
+def split_ranges(low, high, chunk_size):
+    """
+    :return: list of inclusive (start, end) ranges covering low..high
+    """
+    return [(start, min(start + chunk_size - 1, high)) for start in range(low, high + 1, chunk_size)]
+
+
+def create_batch(handler, model_label, chunk_size=1000, params=None):
+    """
+    Describe a job over every primary key of model_label and store it
+    :param handler: registered handler name
+    :param model_label: 'app_label.ModelName' whose pk range is split
+    :param chunk_size: primary keys per chunk
+    :param params: extra JSON-serialisable keyword arguments for the handler
+    :return: BatchJob
+    """
+    if handler not in _handlers:
+        raise KeyError("no batch handler named {}".format(handler))
+    bounds = apps.get_model(model_label).objects.aggregate(low=Min('pk'), high=Max('pk'))
+    ranges = []
+    if bounds['low'] is not None:
+        ranges = split_ranges(bounds['low'], bounds['high'], chunk_size)
+    return BatchJob.objects.create(handler=handler, model=model_label, params=params or {}, ranges=ranges)
+
+
+def pending_chunks(job):
+    """
+    :return: indexes of the job's chunks that have not finished
+    """
+    done = set(job.chunks.values_list('index', flat=True))
+    return [index for index in range(len(job.ranges)) if index not in done]
+
+
+def dispatch(job):
+    job_id = str(job.pk)
+    pending = pending_chunks(job)
+    if not pending:
+        finish_batch.delay([], job_id)
+        return
+    chord(process_chunk.s(job_id, index) for index in pending)(finish_batch.s(job_id))
+
+
+def start_batch(handler, model_label, chunk_size=1000, params=None):
+    """
+    Create a job and fan its chunks out to the workers
+    :return: job id
+    """
+    job = create_batch(handler, model_label, chunk_size, params)
+    dispatch(job)
+    return str(job.pk)
+
+
+def resume_batch(job_id):
+    """
+    Re-dispatch the unfinished chunks of a job, e.g. after a worker died
+    :return: number of chunks re-dispatched
+    """
+    job = BatchJob.objects.filter(pk=job_id).first()
+    if job is None or job.status == BatchJob.DONE:
+        return 0
+    pending = pending_chunks(job)
+    dispatch(job)
+    return len(pending)
+
+
+def batch_progress(job_id):
+    """
+    :return: dict with status, total and done chunk counts and rows processed, or None
+    """
+    job = BatchJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return None
+    done = job.chunks.aggregate(done=Count('id'), processed=Sum('processed'))
+    return {
+        'status': job.status,
+        'total': len(job.ranges),
+        'done': done['done'],
+        'processed': done['processed'] or 0,
+    }
+
+
+@app.task(bind=True, acks_late=True, max_retries=3, default_retry_delay=30)
+def process_chunk(self, job_id, index):
+    job = BatchJob.objects.filter(pk=job_id).first()
+    if job is None or job.chunks.filter(index=index).exists():
+        return 0
+    start, end = job.ranges[index]
+    try:
+        processed = _handlers[job.handler](start, end, **job.params)
+    except Exception as e:
+        raise self.retry(exc=e)
+    try:
+        with transaction.atomic():
+            BatchChunk.objects.create(job=job, index=index, processed=processed or 0)
+    except IntegrityError:
+        # a redelivered copy of this chunk finished first
+        pass
+    return processed or 0
+
+
+@app.task
+def finish_batch(results, job_id):
+    job = BatchJob.objects.filter(pk=job_id).first()
+    if job is not None and not pending_chunks(job):
+        BatchJob.objects.filter(pk=job_id).update(status=BatchJob.DONE, finished=timezone.now())
@@ -1,6 +1,7 @@
 
 import os
 from celery import Celery
+from celery.signals import task_prerun
 from django.apps import apps, AppConfig
 from django.conf import settings
 
@@ -23,6 +24,9 @@ class CeleryConfig(AppConfig):
         app.config_from_object('django.conf:settings')
         installed_apps = [app_config.name for app_config in apps.get_app_configs()]
         app.autodiscover_tasks(lambda: installed_apps, force=True)
+        from walkup_law.taskapp import batch  # noqa
+        from walkup_law.walkup_law.db import check_connections
+        task_prerun.connect(check_connections, dispatch_uid='check_connections')
 
         if hasattr(settings, 'RAVEN_CONFIG'):
             # Celery signal registration
@@ -0,0 +1,35 @@
+import uuid
+
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+
+
+class BatchJob(models.Model):
+    """
+    A chunked batch job, see batch.py. ranges holds the inclusive (start, end)
+    primary key range of every chunk.
+    """
+    RUNNING = 'running'
+    DONE = 'done'
+    STATUS_CHOICES = ((RUNNING, 'running'), (DONE, 'done'))
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    handler = models.CharField(max_length=100)
+    model = models.CharField(max_length=100)
+    params = JSONField(default=dict)
+    ranges = JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(blank=True, null=True)
+
+
+class BatchChunk(models.Model):
+    """
+    Marker for a finished chunk of a BatchJob, with the rows it processed
+    """
+    job = models.ForeignKey(BatchJob, on_delete=models.CASCADE, related_name='chunks')
+    index = models.PositiveIntegerField()
+    processed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('job', 'index')
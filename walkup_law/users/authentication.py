@@ -0,0 +1,95 @@
+"""
+Drop-in replacement for DRF's TokenAuthentication that avoids the Token JOIN
+User query on every request. Snapshots of the few fields authentication needs
+are kept in a bounded in-process TTL cache in front of Redis; the user built
+from them loads any other field lazily. signals.py evicts snapshots once a
+token deletion or user change commits.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from walkup_law.walkup_law import routers
+from walkup_law.walkup_law.cache import LocalTTLCache, count, flush_counters, get_counters
+
+TOKEN_KEY = 'auth-token:{}'
+
+# what permissions and djoser's user serializer read; never the password hash
+# or anything else a cache dump should not reveal
+SNAPSHOT_USER_FIELDS = ('id', 'username', 'email', 'is_active', 'is_staff', 'is_superuser')
+
+_local = LocalTTLCache(maxsize=settings.TOKEN_AUTH_LOCAL_CACHE_SIZE, ttl=settings.TOKEN_AUTH_LOCAL_TTL)
+
+
+def token_cache_key(key):
+    # raw tokens are credentials, keep them out of Redis key names
+    return TOKEN_KEY.format(hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+
+def evict_token(key):
+    cache_key = token_cache_key(key)
+    _local.delete(cache_key)
+    cache.delete(cache_key)
+
+
+def hit_ratio():
+    """
+    :return: dict of hit/miss counters per layer and the overall hit ratio
+    """
+    flush_counters()
+    counters = get_counters(['token-auth:local-hits', 'token-auth:redis-hits', 'token-auth:misses'])
+    hits = counters['token-auth:local-hits'] + counters['token-auth:redis-hits']
+    total = hits + counters['token-auth:misses']
+    counters['hit_ratio'] = float(hits) / total if total else None
+    return counters
+
+
+def from_fields(model, values):
+    """
+    Instance of model with only the given attnames loaded, the rest deferred
+    """
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        snapshot = _local.get(cache_key)
+        if snapshot is not None:
+            count('token-auth:local-hits')
+        else:
+            snapshot = cache.get(cache_key)
+            if snapshot is not None:
+                count('token-auth:redis-hits')
+            else:
+                count('token-auth:misses')
+                model = self.get_model()
+                try:
+                    # never from a replica: a lagging one would re-cache a revoked
+                    # token or deactivated user for TOKEN_AUTH_CACHE_TIMEOUT
+                    token = model.objects.using(DEFAULT_DB_ALIAS).select_related('user').get(key=key)
+                except model.DoesNotExist:
+                    raise exceptions.AuthenticationFailed(_('Invalid token.'))
+                snapshot = {
+                    'user': {name: getattr(token.user, name) for name in SNAPSHOT_USER_FIELDS},
+                    'created': token.created,
+                }
+                cache.set(cache_key, snapshot, settings.TOKEN_AUTH_CACHE_TIMEOUT)
+            _local.set(cache_key, snapshot)
+
+        if not snapshot['user']['is_active']:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        # fresh instances per request, the snapshot itself is shared
+        user = from_fields(get_user_model(), snapshot['user'])
+        token = from_fields(self.get_model(), {'key': key, 'user_id': user.pk, 'created': snapshot['created']})
+        token.user = user
+        routers.apply_user_pin(user.pk)
+        return (user, token)
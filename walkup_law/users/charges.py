@@ -0,0 +1,140 @@
+"""
+Keeps the local Charge table in sync with Stripe. Webhook events are applied as
+they arrive; reconcile_events replays the events created since its last run to
+pick up anything a missed webhook left behind, whatever the age of the charge,
+and reconcile_user_charges backfills a customer's recent charges from the API.
+Events arrive out of order, so each row remembers the time of the data it holds
+and older data is dropped.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from walkup_law.users.models import Charge, StripeEventCursor, User
+
+CHARGE_EVENTS = (
+    'charge.captured',
+    'charge.failed',
+    'charge.pending',
+    'charge.refunded',
+    'charge.succeeded',
+    'charge.updated',
+)
+
+# the event holds the dispute, not the charge, which is read back from the API
+DISPUTE_EVENTS = (
+    'charge.dispute.closed',
+    'charge.dispute.created',
+    'charge.dispute.funds_reinstated',
+    'charge.dispute.funds_withdrawn',
+)
+
+# re-list this far behind the newest local charge so late status changes are seen
+RECONCILE_OVERLAP = datetime.timedelta(days=3)
+# Stripe lists events for 30 days; replay from a little before the cursor
+# because events can show up in the list shortly after their creation time
+EVENT_RETENTION = datetime.timedelta(days=30)
+EVENT_OVERLAP = datetime.timedelta(minutes=10)
+
+
+def get_stripe():
+    import stripe
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    return stripe
+
+
+def upsert_charge(data, user=None, as_of=None):
+    """
+    Create or update the local row for a Stripe charge object
+    :param data: charge object (dict-like) from the API or a webhook
+    :param user: owner, looked up by stripe_customer_id when not given
+    :param as_of: unix time of the event carrying data, defaults to now for
+        data just read from the API. Data older than the row is ignored, so a
+        late charge.succeeded cannot overwrite a refund
+    :return: Charge, or None if no user has that customer id
+    """
+    if user is None:
+        user = User.objects.filter(stripe_customer_id=data['customer']).first()
+        if user is None:
+            return None
+    synced_at = datetime.datetime.fromtimestamp(as_of if as_of is not None else time.time(), tz=timezone.utc)
+    fields = {
+        'user': user,
+        'amount': data['amount'],
+        'currency': data['currency'],
+        'status': data['status'],
+        'description': data.get('description') or '',
+        'paid': data.get('paid', False),
+        'refunded': data.get('refunded', False),
+        'disputed': data.get('disputed', False),
+        'created': datetime.datetime.fromtimestamp(data['created'], tz=timezone.utc),
+        'synced_at': synced_at,
+    }
+    with transaction.atomic():
+        charge, created = Charge.objects.select_for_update().get_or_create(
+            stripe_charge_id=data['id'], defaults=fields)
+        if created or (charge.synced_at is not None and charge.synced_at > synced_at):
+            return charge
+        # refunds are final, even against an event stamped the same second
+        fields['refunded'] = fields['refunded'] or charge.refunded
+        for name, value in fields.items():
+            setattr(charge, name, value)
+        charge.save()
+    return charge
+
+
+def reconcile_user_charges(user):
+    """
+    Pull the user's recent charges from Stripe into the local table
+    :param user: User with a stripe_customer_id
+    :return: number of charges written
+    """
+    if not user.stripe_customer_id:
+        return 0
+    params = {'customer': user.stripe_customer_id, 'limit': 100}
+    latest = Charge.objects.filter(user=user).order_by('-created').values_list('created', flat=True).first()
+    if latest is not None:
+        params['created'] = {'gte': int((latest - RECONCILE_OVERLAP).timestamp())}
+    written = 0
+    for data in get_stripe().Charge.list(**params).auto_paging_iter():
+        upsert_charge(data, user=user)
+        written += 1
+    return written
+
+
+def reconcile_events():
+    """
+    Apply the charge and dispute events Stripe created since the last run,
+    so refunds and disputes of charges of any age are picked up
+    :return: number of events applied
+    """
+    cursor, _ = StripeEventCursor.objects.get_or_create(stream='charges')
+    since = max(cursor.created - int(EVENT_OVERLAP.total_seconds()),
+                int(time.time() - EVENT_RETENTION.total_seconds()))
+    events = get_stripe().Event.list(types=list(CHARGE_EVENTS + DISPUTE_EVENTS), created={'gte': since}, limit=100)
+    newest = cursor.created
+    applied = 0
+    for event in events.auto_paging_iter():
+        handle_event(event)
+        newest = max(newest, event['created'])
+        applied += 1
+    StripeEventCursor.objects.filter(pk=cursor.pk, created__lt=newest).update(created=newest)
+    return applied
+
+
+def handle_event(event):
+    """
+    Apply a verified Stripe webhook event
+    :param event: event object (dict-like)
+    :return: True if the event type is handled
+    """
+    if event['type'] in CHARGE_EVENTS:
+        upsert_charge(event['data']['object'], as_of=event['created'])
+        return True
+    if event['type'] in DISPUTE_EVENTS:
+        upsert_charge(get_stripe().Charge.retrieve(event['data']['object']['charge']))
+        return True
+    return False
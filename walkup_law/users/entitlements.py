@@ -0,0 +1,115 @@
+"""
+Subscription entitlement checks. The paid-through timestamp of a user is read
+from a short-lived in-process LRU, then Redis, and only then from the users
+table. Subscription webhooks write the new timestamp and invalidate both layers;
+events older than the last one applied to the user are ignored, since Stripe
+does not deliver them in order.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law.cache import LocalTTLCache
+
+ENTITLEMENT_KEY = 'entitlement:{}'
+
+SUBSCRIPTION_EVENTS = (
+    'customer.subscription.created',
+    'customer.subscription.updated',
+    'customer.subscription.deleted',
+)
+# statuses that keep access until the end of the current period
+PAYING_STATUSES = ('active', 'trialing', 'past_due')
+
+_local = LocalTTLCache(maxsize=settings.ENTITLEMENT_LOCAL_CACHE_SIZE, ttl=settings.ENTITLEMENT_LOCAL_TTL)
+
+
+def get_paid_through(user_id):
+    """
+    :param user_id: primary key of the user
+    :return: unix timestamp the user is paid through, or None
+    """
+    # 0 stands for "never paid" so it can be cached; None means a miss
+    paid_through = _local.get(user_id)
+    if paid_through is None:
+        key = ENTITLEMENT_KEY.format(user_id)
+        paid_through = cache.get(key)
+        if paid_through is None:
+            # the primary, so a lagging replica cannot re-cache a cancelled subscription
+            paid_through = User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id).values_list(
+                'stripe_subscription_paid_through', flat=True).first() or 0
+            cache.set(key, paid_through, settings.ENTITLEMENT_CACHE_TIMEOUT)
+        _local.set(user_id, paid_through)
+    return paid_through or None
+
+
+def is_entitled(user, now=None):
+    """
+    :param user: User, may be anonymous
+    :param now: unix time to compare against, defaults to the current time
+    :return: True while the user's subscription is paid up
+    """
+    if not user.is_authenticated:
+        return False
+    paid_through = get_paid_through(user.pk)
+    return paid_through is not None and paid_through > (now if now is not None else time.time())
+
+
+def invalidate(user_id):
+    _local.delete(user_id)
+    cache.delete(ENTITLEMENT_KEY.format(user_id))
+
+
+def set_paid_through(user_id, paid_through, subscription_id=None, event=None):
+    """
+    Store a new paid-through timestamp and drop cached copies once it commits;
+    earlier, a concurrent read could re-cache the old timestamp
+    :param user_id: primary key of the user
+    :param paid_through: unix timestamp or None
+    :param subscription_id: Stripe subscription id to record, if known
+    :param event: the Stripe event carrying the change; it is skipped if an
+        event created later was already applied. On a tie only a deletion wins
+    :return: True if the timestamp was stored
+    """
+    fields = {'stripe_subscription_paid_through': paid_through}
+    if subscription_id is not None:
+        fields['stripe_subscription_id'] = subscription_id
+    users = User.objects.filter(pk=user_id)
+    if event is not None:
+        fields['stripe_subscription_event_at'] = event['created']
+        if event['type'] == 'customer.subscription.deleted':
+            newer = Q(stripe_subscription_event_at__lte=event['created'])
+        else:
+            newer = Q(stripe_subscription_event_at__lt=event['created'])
+        users = users.filter(newer | Q(stripe_subscription_event_at__isnull=True))
+    if not users.update(**fields):
+        return False
+    transaction.on_commit(lambda: invalidate(user_id))
+    return True
+
+
+def handle_event(event):
+    """
+    Apply a verified Stripe subscription webhook event
+    :param event: event object (dict-like)
+    :return: True if the event type is handled
+    """
+    if event['type'] not in SUBSCRIPTION_EVENTS:
+        return False
+    subscription = event['data']['object']
+    user_id = (User.objects.using(DEFAULT_DB_ALIAS).filter(stripe_customer_id=subscription['customer'])
+               .values_list('id', flat=True).first())
+    if user_id is None:
+        return True
+    if event['type'] == 'customer.subscription.deleted':
+        paid_through = subscription.get('ended_at') or int(time.time())
+    elif subscription['status'] in PAYING_STATUSES:
+        paid_through = subscription['current_period_end']
+    else:
+        paid_through = None
+    set_paid_through(user_id, paid_through, subscription_id=subscription['id'], event=event)
+    return True
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.urls import reverse
@@ -13,6 +14,8 @@ class User(AbstractUser):
     stripe_subscription_id = models.CharField(_('stripe subscription id'), max_length=250)
     stripe_subscription_paid_through = models.IntegerField(_('time stamp that the users is paid up through'),
                                                            blank=True, null=True)
+    stripe_subscription_event_at = models.IntegerField(_('time stamp of the last subscription event applied'),
+                                                       blank=True, null=True)
 
 
     def __str__(self):
@@ -20,3 +23,41 @@ class User(AbstractUser):
 
     def get_absolute_url(self):
         return reverse('users:detail', kwargs={'username': self.username})
+
+
+class Charge(models.Model):
+    """
+    Local mirror of a Stripe charge, kept in sync by the Stripe webhook and a
+    periodic reconciliation task so charge history is read from Postgres.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='charges')
+    stripe_charge_id = models.CharField(_('stripe charge id'), unique=True, max_length=250)
+    amount = models.IntegerField(_('amount in the smallest currency unit'))
+    currency = models.CharField(max_length=3)
+    status = models.CharField(max_length=20)
+    description = models.TextField(blank=True)
+    paid = models.BooleanField(default=False)
+    refunded = models.BooleanField(default=False)
+    disputed = models.BooleanField(default=False)
+    created = models.DateTimeField(_('time stripe created the charge'))
+    synced_at = models.DateTimeField(_('time of the stripe event or api read the row reflects'), null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created', '-id']),
+        ]
+
+    def __str__(self):
+        return self.stripe_charge_id
+
+
+class StripeEventCursor(models.Model):
+    """
+    Creation time of the newest Stripe event a reconciliation has applied, one
+    row per stream of event types.
+    """
+    stream = models.CharField(unique=True, max_length=50)
+    created = models.IntegerField(_('unix time of the newest applied event'), default=0)
+
+    def __str__(self):
+        return self.stream
@@ -0,0 +1,27 @@
+from rest_framework.permissions import BasePermission
+
+from walkup_law.users.entitlements import is_entitled
+
+
+class HasActiveSubscription(BasePermission):
+    """
+    Allows access only to users whose subscription is paid up
+    """
+    message = 'An active subscription is required.'
+
+    def has_permission(self, request, view):
+        return is_entitled(request.user)
+
+
+class PaidContentPermission(BasePermission):
+    """
+    Objects with a truthy `paid` attribute need an active subscription,
+    everything else is open to any authenticated user
+    """
+    message = 'An active subscription is required.'
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated)
+
+    def has_object_permission(self, request, view, obj):
+        return not getattr(obj, 'paid', False) or is_entitled(request.user)
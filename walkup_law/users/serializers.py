@@ -1,5 +1,11 @@
 from rest_framework import serializers
 
-from walkup_law.users.models import User
+from walkup_law.users.models import Charge, User
 
 
+class ChargeSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Charge
+        fields = ('stripe_charge_id', 'amount', 'currency', 'status', 'description', 'paid', 'refunded',
+                  'disputed', 'created')
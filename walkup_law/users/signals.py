@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from walkup_law.users.authentication import evict_token
+from walkup_law.users.models import User
+from walkup_law.walkup_law.routers import pin_user
+
+
+def evict_on_commit(keys):
+    # evicting earlier lets a concurrent request re-cache the pre-commit snapshot
+    keys = list(keys)
+
+    def evict():
+        for key in keys:
+            evict_token(key)
+    transaction.on_commit(evict)
+
+
+@receiver(post_save, sender=Token)
+def token_created(sender, instance, created=False, **kwargs):
+    # a login: the new key has no credential pin yet, so pin the user
+    if created:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: pin_user(user_id))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    evict_on_commit([instance.key])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    evict_on_commit(Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
@@ -0,0 +1,10 @@
+from walkup_law.taskapp.celery import app
+from walkup_law.users.charges import reconcile_events
+
+
+@app.task
+def reconcile_charges():
+    """
+    Periodic: replay the Stripe charge events created since the last run
+    """
+    reconcile_events()
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITransactionTestCase
+
+from walkup_law.users import authentication
+from walkup_law.users.models import User
+from walkup_law.walkup_law import routers
+
+
+# APITransactionTestCase: eviction runs on commit, which APITestCase never reaches
+class CachedTokenAuthenticationTests(APITransactionTestCase):
+
+    def setUp(self):
+        authentication.flush_counters()
+        cache.clear()
+        authentication._local.clear()
+        self.user = User.objects.create(username="attorney")
+        self.token = Token.objects.create(user=self.user)
+        self.backend = authentication.CachedTokenAuthentication()
+
+    def test_repeat_authentication_runs_no_queries(self):
+        user, token = self.backend.authenticate_credentials(self.token.key)
+        self.assertEqual(user.pk, self.user.pk)
+        with self.assertNumQueries(0):
+            user, token = self.backend.authenticate_credentials(self.token.key)
+        self.assertEqual(token.key, self.token.key)
+
+        stats = authentication.hit_ratio()
+        self.assertEqual(stats['token-auth:misses'], 1)
+        self.assertEqual(stats['token-auth:local-hits'], 1)
+
+    def test_deleted_token_is_evicted(self):
+        self.backend.authenticate_credentials(self.token.key)
+        self.token.delete()
+        with self.assertRaises(authentication.exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(self.token.key)
+
+    def test_user_change_is_evicted(self):
+        self.backend.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(authentication.exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(self.token.key)
+
+    @override_settings(DATABASE_REPLICAS=['replica0'])
+    @mock.patch.object(routers, 'replica_is_healthy', return_value=True)
+    def test_cache_fill_ignores_lagging_replica(self, healthy):
+        # replica0 stands for a replica that has not replayed the deactivation;
+        # it is not configured, so any read routed to it would raise
+        self.user.is_active = False
+        self.user.save()
+        with routers.replica_reads():
+            with self.assertRaises(authentication.exceptions.AuthenticationFailed):
+                self.backend.authenticate_credentials(self.token.key)
+
+    def test_eviction_waits_for_commit(self):
+        self.backend.authenticate_credentials(self.token.key)
+        with transaction.atomic():
+            self.user.is_active = False
+            self.user.save()
+            # still the committed snapshot inside the writer's transaction
+            self.backend.authenticate_credentials(self.token.key)
+        with self.assertRaises(authentication.exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(self.token.key)
+
+    def test_snapshot_holds_no_password(self):
+        self.user.set_password("correct horse")
+        self.user.save()
+        user, token = self.backend.authenticate_credentials(self.token.key)
+        snapshot = cache.get(authentication.token_cache_key(self.token.key))
+        self.assertNotIn('password', snapshot['user'])
+        self.assertEqual(user.get_deferred_fields() & {'username', 'is_active'}, set())
+        # deferred fields still load on access
+        self.assertTrue(user.check_password("correct horse"))
+
+    def test_is_the_default_authentication(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response = self.client.get(reverse('user-charges'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(authentication.hit_ratio()['token-auth:misses'], 1)
+        response = self.client.get(reverse('user-charges'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(authentication.hit_ratio()['token-auth:misses'], 1)
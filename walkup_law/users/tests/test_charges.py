@@ -0,0 +1,135 @@
+import time
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from walkup_law.users import charges
+from walkup_law.users.models import Charge, StripeEventCursor, User
+
+
+def fake_charge(charge_id, created, status='succeeded', customer='cus_1', refunded=False):
+    return {'id': charge_id, 'customer': customer, 'amount': 1500, 'currency': 'usd', 'status': status,
+            'description': 'Monthly plan', 'paid': True, 'refunded': refunded, 'created': created}
+
+
+def fake_event(event_type, data, created):
+    return {'type': event_type, 'created': created, 'data': {'object': data}}
+
+
+class FakeChargeList(object):
+
+    def __init__(self, data):
+        self.data = data
+
+    def auto_paging_iter(self):
+        return iter(self.data)
+
+
+class FakeStripe(object):
+    """Local stand-in for the stripe module"""
+
+    def __init__(self, data, events=()):
+        self.calls = []
+        self.event_calls = []
+        stripe = self
+
+        class Charge(object):
+            @staticmethod
+            def list(**params):
+                stripe.calls.append(params)
+                return FakeChargeList(data)
+
+            @staticmethod
+            def retrieve(charge_id):
+                return next(charge for charge in data if charge['id'] == charge_id)
+
+        class Event(object):
+            @staticmethod
+            def list(**params):
+                stripe.event_calls.append(params)
+                return FakeChargeList(events)
+
+        self.Charge = Charge
+        self.Event = Event
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET='', DEBUG=True)
+class ChargeMirrorTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="client", stripe_customer_id="cus_1")
+
+    def test_reconcile_upserts_and_is_incremental(self):
+        stripe = FakeStripe([fake_charge('ch_1', 1520000000), fake_charge('ch_2', 1520100000)])
+        with mock.patch.object(charges, 'get_stripe', return_value=stripe):
+            self.assertEqual(charges.reconcile_user_charges(self.user), 2)
+            charges.reconcile_user_charges(self.user)
+        self.assertEqual(Charge.objects.filter(user=self.user).count(), 2)
+        self.assertNotIn('created', stripe.calls[0])
+        self.assertLess(stripe.calls[1]['created']['gte'], 1520100000)
+
+    def test_event_reconcile_catches_refunds_and_disputes_of_old_charges(self):
+        old = int(time.time()) - 90 * 86400
+        charges.upsert_charge(fake_charge('ch_old', old), as_of=old)
+        charges.upsert_charge(fake_charge('ch_disputed', old), as_of=old)
+        now = int(time.time())
+        disputed = dict(fake_charge('ch_disputed', old), disputed=True)
+        events = [fake_event('charge.refunded', fake_charge('ch_old', old, refunded=True), now - 60),
+                  fake_event('charge.dispute.created', {'id': 'dp_1', 'charge': 'ch_disputed'}, now - 30)]
+        stripe = FakeStripe([disputed], events)
+        with mock.patch.object(charges, 'get_stripe', return_value=stripe):
+            self.assertEqual(charges.reconcile_events(), 2)
+            charges.reconcile_events()
+
+        self.assertTrue(Charge.objects.get(stripe_charge_id='ch_old').refunded)
+        self.assertTrue(Charge.objects.get(stripe_charge_id='ch_disputed').disputed)
+        self.assertEqual(StripeEventCursor.objects.get(stream='charges').created, now - 30)
+        self.assertLess(stripe.event_calls[0]['created']['gte'], now - 60)
+        self.assertGreater(stripe.event_calls[1]['created']['gte'], stripe.event_calls[0]['created']['gte'])
+
+    def test_webhook_updates_local_row(self):
+        charges.upsert_charge(fake_charge('ch_1', 1520000000, status='pending'), as_of=1520000000)
+        event = fake_event('charge.succeeded', fake_charge('ch_1', 1520000000), 1520000005)
+        response = self.client.post(reverse('stripe-webhook'), data=event, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Charge.objects.get(stripe_charge_id='ch_1').status, 'succeeded')
+
+    def test_late_event_cannot_undo_refund(self):
+        charges.handle_event(fake_event('charge.refunded', fake_charge('ch_1', 1520000000, refunded=True),
+                                        1520000100))
+        charges.handle_event(fake_event('charge.succeeded', fake_charge('ch_1', 1520000000), 1520000005))
+        self.assertTrue(Charge.objects.get(stripe_charge_id='ch_1').refunded)
+
+        # the same second: the refund still stands
+        charges.handle_event(fake_event('charge.updated', fake_charge('ch_1', 1520000000), 1520000100))
+        self.assertTrue(Charge.objects.get(stripe_charge_id='ch_1').refunded)
+
+    def test_webhook_ignores_unknown_customer(self):
+        event = fake_event('charge.succeeded', fake_charge('ch_9', 1520000000, customer='cus_x'), 1520000005)
+        response = self.client.post(reverse('stripe-webhook'), data=event, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Charge.objects.exists())
+
+    @override_settings(DEBUG=False)
+    def test_unsigned_webhook_is_rejected_without_debug(self):
+        event = fake_event('charge.succeeded', fake_charge('ch_1', 1520000000), 1520000005)
+        response = self.client.post(reverse('stripe-webhook'), data=event, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Charge.objects.exists())
+
+    def test_get_user_charges_reads_local_rows(self):
+        for i in range(3):
+            charges.upsert_charge(fake_charge('ch_{}'.format(i), 1520000000 + i))
+        other = User.objects.create(username="other", stripe_customer_id="cus_2")
+        charges.upsert_charge(fake_charge('ch_other', 1520000000, customer='cus_2'), user=other)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('user-charges'), {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['stripe_charge_id'] for row in response.data['results']], ['ch_2', 'ch_1'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['stripe_charge_id'] for row in response.data['results']], ['ch_0'])
+        self.assertIsNone(response.data['next'])
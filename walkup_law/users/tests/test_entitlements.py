@@ -0,0 +1,99 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITransactionTestCase
+
+from walkup_law.users import entitlements
+from walkup_law.users.models import User
+from walkup_law.users.permissions import HasActiveSubscription, PaidContentPermission
+from walkup_law.walkup_law import routers
+
+
+class PaidThing(object):
+    paid = True
+
+
+# APITransactionTestCase: invalidation runs on commit, which APITestCase never reaches
+@override_settings(STRIPE_WEBHOOK_SECRET='', DEBUG=True)
+class EntitlementTests(APITransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        entitlements._local.clear()
+        self.user = User.objects.create(username="subscriber", stripe_customer_id="cus_1",
+                                        stripe_subscription_paid_through=int(time.time()) + 3600)
+
+    def test_second_check_runs_no_queries(self):
+        self.assertTrue(entitlements.is_entitled(self.user))
+        with self.assertNumQueries(0):
+            self.assertTrue(entitlements.is_entitled(self.user))
+
+    def test_redis_layer_survives_local_eviction(self):
+        entitlements.is_entitled(self.user)
+        entitlements._local.clear()
+        with self.assertNumQueries(0):
+            self.assertTrue(entitlements.is_entitled(self.user))
+
+    def test_never_paid(self):
+        user = User.objects.create(username="free")
+        self.assertFalse(entitlements.is_entitled(user))
+        with self.assertNumQueries(0):
+            self.assertFalse(entitlements.is_entitled(user))
+
+    def test_webhook_invalidates(self):
+        self.assertTrue(entitlements.is_entitled(self.user))
+        event = {'type': 'customer.subscription.deleted', 'created': int(time.time()),
+                 'data': {'object': {'id': 'sub_1', 'customer': 'cus_1', 'status': 'canceled',
+                                     'ended_at': int(time.time()) - 60}}}
+        response = self.client.post(reverse('stripe-webhook'), data=event, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(entitlements.is_entitled(self.user))
+        self.assertEqual(User.objects.get(pk=self.user.pk).stripe_subscription_id, 'sub_1')
+
+    def test_late_update_cannot_restore_access(self):
+        now = int(time.time())
+        deleted = {'type': 'customer.subscription.deleted', 'created': now - 10,
+                   'data': {'object': {'id': 'sub_1', 'customer': 'cus_1', 'status': 'canceled',
+                                       'ended_at': now - 10}}}
+        updated = {'type': 'customer.subscription.updated', 'created': now - 20,
+                   'data': {'object': {'id': 'sub_1', 'customer': 'cus_1', 'status': 'active',
+                                       'current_period_end': now + 86400}}}
+        self.assertTrue(entitlements.handle_event(deleted))
+        self.assertTrue(entitlements.handle_event(updated))
+        self.assertFalse(entitlements.is_entitled(self.user))
+
+        # a tie goes to the deletion
+        updated['created'] = now - 10
+        entitlements.handle_event(updated)
+        self.assertFalse(entitlements.is_entitled(self.user))
+
+    @override_settings(DATABASE_REPLICAS=['replica0'])
+    @mock.patch.object(routers, 'replica_is_healthy', return_value=True)
+    def test_cache_fill_ignores_lagging_replica(self, healthy):
+        # replica0 stands for a replica that has not replayed the cancellation;
+        # it is not configured, so any read routed to it would raise
+        entitlements.set_paid_through(self.user.pk, int(time.time()) - 1)
+        with routers.replica_reads():
+            self.assertFalse(entitlements.is_entitled(self.user))
+
+    def test_invalidation_waits_for_commit(self):
+        self.assertTrue(entitlements.is_entitled(self.user))
+        with transaction.atomic():
+            entitlements.set_paid_through(self.user.pk, int(time.time()) - 1)
+            self.assertTrue(entitlements.is_entitled(self.user))
+        self.assertFalse(entitlements.is_entitled(self.user))
+
+    def test_permissions(self):
+        request = APIRequestFactory().get('/')
+        request.user = self.user
+        self.assertTrue(HasActiveSubscription().has_permission(request, None))
+        self.assertTrue(PaidContentPermission().has_object_permission(request, None, PaidThing()))
+
+        entitlements.set_paid_through(self.user.pk, int(time.time()) - 1)
+        self.assertFalse(HasActiveSubscription().has_permission(request, None))
+        self.assertFalse(PaidContentPermission().has_object_permission(request, None, PaidThing()))
+        self.assertTrue(PaidContentPermission().has_object_permission(request, None, object()))
@@ -0,0 +1,9 @@
+from django.conf.urls import url
+
+from walkup_law.users import views
+
+urlpatterns = [
+    url(r'^charges/$', views.get_user_charges, name='user-charges'),
+    url(r'^stripe/webhook/$', views.stripe_webhook, name='stripe-webhook'),
+    url(r'^token-auth-stats/$', views.token_auth_stats, name='token-auth-stats'),
+]
@@ -1,19 +1,78 @@
+import json
+
+from django.conf import settings
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
-from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from walkup_law.users import authentication, charges, entitlements
+from walkup_law.users.models import Charge
+from walkup_law.users.serializers import ChargeSerializer
+from walkup_law.walkup_law.decorators import read_only, write
+from walkup_law.walkup_law.pagination import KeysetPagination
+
+
+class ChargePagination(KeysetPagination):
+    ordering = ('-created', '-id')
+
 
 #Example view
+@read_only
 @api_view(["GET"])
-@authentication_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated])
 def get_user_charges(request):
     """
-    Grab a list of formatted user charges(historical)
+    Grab a list of formatted user charges(historical), newest first, from the
+    local charge mirror
+    :param request: optional ?cursor= and ?limit=
+    :return:
+    """
+    paginator = ChargePagination()
+    page = paginator.paginate_queryset(Charge.objects.filter(user=request.user), request)
+    return paginator.get_paginated_response(ChargeSerializer(page, many=True).data)
+
+
+@write
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def stripe_webhook(request):
+    """
+    Receive Stripe events. The signature is checked against
+    STRIPE_WEBHOOK_SECRET; unsigned events are only accepted with DEBUG on
+    and no secret set
     :param request:
     :return:
     """
-    user = request.user
-    cm = CustomerManager()
-    charges = cm.list_user_charges(user=user)
-    return Response(status=200, data=charges)
+    payload = request.body
+    if settings.STRIPE_WEBHOOK_SECRET:
+        stripe = charges.get_stripe()
+        try:
+            event = stripe.Webhook.construct_event(
+                payload, request.META.get('HTTP_STRIPE_SIGNATURE', ''), settings.STRIPE_WEBHOOK_SECRET)
+        except (ValueError, stripe.error.SignatureVerificationError):
+            return Response(status=400)
+    elif settings.DEBUG:
+        try:
+            event = json.loads(payload.decode('utf-8'))
+        except ValueError:
+            return Response(status=400)
+    else:
+        return Response(status=400)
+    if event['type'] in entitlements.SUBSCRIPTION_EVENTS:
+        entitlements.handle_event(event)
+    else:
+        charges.handle_event(event)
+    return Response(status=200)
+
 
+@read_only
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def token_auth_stats(request):
+    """
+    Hit/miss counters of the token authentication cache
+    :param request:
+    :return:
+    """
+    return Response(status=200, data=authentication.hit_ratio())
@@ -0,0 +1,89 @@
+"""
+Answer submission pipeline. A whole Form response for a Case is validated
+against the form's compiled schema and written as one Submission row plus one
+bulk insert of Answer rows.
+"""
+from django.db import IntegrityError, transaction
+
+from walkup_law.walkup_law.compiler import get_compiled_schema
+from walkup_law.walkup_law.models import Answer, Case, Submission
+
+
+class SubmissionError(Exception):
+    """
+    Raised when a submission does not match its form. `errors` maps a question
+    id, or a payload field name, to a message
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def validate_answers(schema, answers):
+    """
+    Check answers against a compiled form schema
+    :param schema: compiled schema dict, see compiler.build_schema
+    :param answers: dict of question id -> answer string
+    :return: dict of errors, empty when valid
+    """
+    questions = {question['id']: question
+                 for group in schema['groups']
+                 for question in group['questions']}
+    errors = {}
+    for question_id in answers:
+        if question_id not in questions:
+            errors[str(question_id)] = "not a question on this form"
+    for question_id, question in questions.items():
+        if question['required'] and not (answers.get(question_id) or '').strip():
+            errors[str(question_id)] = "an answer is required"
+    return errors
+
+
+def submit_answers(case_id, form_id, client_submission_id, answers):
+    """
+    Persist a form response for a case. Resubmitting the same client_submission_id
+    returns the original submission instead of writing again
+    :param case_id: primary key of the Case
+    :param form_id: primary key of the Form
+    :param client_submission_id: UUID chosen by the client
+    :param answers: dict of question id (int) -> answer string
+    :return: (Submission, created)
+    :raises SubmissionError: when the payload does not match the form
+    """
+    existing = Submission.objects.filter(client_submission_id=client_submission_id).first()
+    if existing is not None:
+        return _replayed(existing, case_id, form_id)
+
+    if not Case.objects.filter(pk=case_id).exists():
+        raise SubmissionError({'case': "case does not exist"})
+    schema = get_compiled_schema(form_id)
+    errors = validate_answers(schema, answers)
+    if errors:
+        raise SubmissionError(errors)
+
+    try:
+        with transaction.atomic():
+            submission = Submission.objects.create(
+                client_submission_id=client_submission_id,
+                case_id=case_id,
+                form_id=form_id,
+                form_version=schema['version'],
+            )
+            Answer.objects.bulk_create([
+                Answer(submission=submission, case_id=case_id, question_id=question_id, value=value)
+                for question_id, value in answers.items()
+            ])
+    except IntegrityError:
+        # a concurrent retry of the same payload won the insert
+        existing = Submission.objects.filter(client_submission_id=client_submission_id).first()
+        if existing is None:
+            raise
+        return _replayed(existing, case_id, form_id)
+    return submission, True
+
+
+def _replayed(submission, case_id, form_id):
+    if submission.case_id != case_id or submission.form_id != form_id:
+        raise SubmissionError({'client_submission_id': "already used for another case or form"})
+    return submission, False
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.core.signals import request_started
+
+
+class TelevisionConfig(AppConfig):
+    name = 'walkup_law.walkup_law'
+    verbose_name = "Walkup Law"
+
+    def ready(self):
+        from walkup_law.walkup_law import signals  # noqa
+        from walkup_law.walkup_law.db import check_connections
+        request_started.connect(check_connections, dispatch_uid='check_connections')
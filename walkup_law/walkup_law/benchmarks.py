@@ -0,0 +1,332 @@
+"""
+Repeatable API benchmarks. Each scenario is replayed in-process through the
+Django test client against the configured database and cache, recording
+throughput, latency percentiles and queries per request. Results are written
+as JSON and can be compared to a stored baseline.
+"""
+import json
+import math
+import multiprocessing
+import queue
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+from django.utils.crypto import get_random_string
+from rest_framework.authtoken.models import Token
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law.compiler import get_compiled_schema
+from walkup_law.walkup_law.models import Case, Form
+
+BENCHMARK_USERNAME = 'benchmark-admin'
+
+# url_names are tried in order so the suite works across djoser versions;
+# kwargs/data/params take the context built by prepare_context
+Scenario = namedtuple('Scenario', 'name method url_names kwargs data params')
+
+SCENARIOS = (
+    Scenario('list-videos', 'GET', ('list-videos',), None, None, None),
+    Scenario('create-video', 'POST', ('create-video',), None,
+             lambda ctx: {'name': 'benchmark video', 'description': 'benchmark', 'link': 'https://example.com'},
+             None),
+    Scenario('list-channels', 'GET', ('list-channels',), None, None, None),
+    Scenario('auth-me', 'GET', ('user-me', 'user'), None, None, None),
+    # djoser's token login; skipped unless djoser.urls.authtoken is mounted
+    Scenario('token-create', 'POST', ('token-create', 'token-login', 'login'), None,
+             lambda ctx: {'username': BENCHMARK_USERNAME, 'password': ctx['password']}, None),
+    Scenario('attorney-caseload', 'GET', ('attorney-caseload',), None, None,
+             lambda ctx: {'attorney': ctx['attorney'], 'status': 'open'}),
+    Scenario('form-schema', 'GET', ('form-schema',), lambda ctx: {'form_id': ctx['form_id']}, None, None),
+    Scenario('submit-answers', 'POST', ('submit-answers',), lambda ctx: {'case_id': ctx['case_id']},
+             lambda ctx: {'client_submission_id': str(uuid.uuid4()), 'form': ctx['form_id'],
+                          'answers': ctx['answers']},
+             None),
+    Scenario('user-charges', 'GET', ('user-charges',), None, None, None),
+)
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def prepare_context(allow_create_user=False):
+    """
+    Staff user, token and ids the scenarios need. Missing rows make the
+    scenarios that depend on them skip. The user's password is replaced by a
+    random one on every run, so it is only ever known to the running benchmark
+    :param allow_create_user: create the staff user when it does not exist;
+        without it that is only done when DEBUG is on
+    """
+    user = User.objects.filter(username=BENCHMARK_USERNAME).first()
+    if user is None:
+        if not (settings.DEBUG or allow_create_user):
+            raise ImproperlyConfigured(
+                'Refusing to create the staff user {!r} with DEBUG off; '
+                'pass --allow-create-user'.format(BENCHMARK_USERNAME))
+        user = User(username=BENCHMARK_USERNAME, is_staff=True)
+    password = get_random_string(32)
+    user.set_password(password)
+    user.save()
+    token, _ = Token.objects.get_or_create(user=user)
+    case = Case.objects.order_by('pk').first()
+    form = Form.objects.order_by('pk').first()
+    answers = {}
+    if form is not None:
+        schema = get_compiled_schema(form.pk)
+        answers = {str(question['id']): 'benchmark'
+                   for group in schema['groups'] for question in group['questions']}
+    return {
+        'token': token.key,
+        'password': password,
+        'attorney': case.attorney if case else None,
+        'case_id': case.pk if case else None,
+        'form_id': form.pk if form else None,
+        'answers': answers,
+    }
+
+
+def resolve(scenario, context):
+    kwargs = scenario.kwargs(context) if scenario.kwargs else None
+    if kwargs and None in kwargs.values():
+        return None
+    for name in scenario.url_names:
+        try:
+            return reverse(name, kwargs=kwargs)
+        except NoReverseMatch:
+            continue
+    return None
+
+
+def run_scenario(client, scenario, context, iterations, warmup, atomic=False):
+    """
+    :param atomic: replay each request inside one transaction, as the global
+        ATOMIC_REQUESTS did, to measure what the per-view policy saves
+    :return: result dict, or None when the scenario's endpoint or data is missing
+    """
+    url = resolve(scenario, context)
+    if url is None:
+        return None
+    params = scenario.params(context) if scenario.params else None
+    if params and None in params.values():
+        return None
+    timings = []
+    query_counts = []
+    statuses = set()
+    for i in range(warmup + iterations):
+        if scenario.method == 'GET':
+            request = lambda: client.get(url, params or {})  # noqa
+        else:
+            body = json.dumps(scenario.data(context) if scenario.data else {})
+            request = lambda: client.generic(scenario.method, url, body, content_type='application/json')  # noqa
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if atomic:
+                with transaction.atomic():
+                    response = request()
+            else:
+                response = request()
+            elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+            query_counts.append(len(queries))
+            statuses.add(response.status_code)
+    timings.sort()
+    return OrderedDict([
+        ('requests', iterations),
+        ('throughput', iterations / sum(timings) if sum(timings) else None),
+        ('p50_ms', percentile(timings, 0.50) * 1000),
+        ('p95_ms', percentile(timings, 0.95) * 1000),
+        ('p99_ms', percentile(timings, 0.99) * 1000),
+        ('queries_per_request', float(sum(query_counts)) / len(query_counts)),
+        ('status_codes', sorted(statuses)),
+    ])
+
+
+def run_suite(iterations=100, warmup=10, only=None, atomic=False, context=None):
+    """
+    :param only: optional iterable of scenario names to run
+    :param atomic: see run_scenario
+    :param context: from prepare_context, which is called when omitted
+    :return: (results dict of name -> result, list of skipped names)
+    """
+    context = context or prepare_context()
+    client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION='Token ' + context['token'])
+    results = OrderedDict()
+    skipped = []
+    for scenario in SCENARIOS:
+        if only and scenario.name not in only:
+            continue
+        result = run_scenario(client, scenario, context, iterations, warmup, atomic)
+        if result is None:
+            skipped.append(scenario.name)
+        else:
+            results[scenario.name] = result
+    return results, skipped
+
+
+def compare(results, baseline, threshold):
+    """
+    List regressions against a baseline: a status outside 2xx/3xx or a set of
+    statuses that differs from the baseline's, p95 latency or throughput worse
+    by more than threshold (a fraction), or more queries per request
+    :return: list of human readable regression messages
+    """
+    regressions = []
+    for name, result in results.items():
+        failed = [status for status in result.get('status_codes', ()) if not 200 <= status < 400]
+        if failed:
+            regressions.append('{}: returned {}'.format(name, failed))
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if 'status_codes' in previous and result.get('status_codes') != previous['status_codes']:
+            regressions.append('{}: status codes {} vs baseline {}'.format(
+                name, result.get('status_codes'), previous['status_codes']))
+        if result['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append('{}: p95 {:.1f}ms vs baseline {:.1f}ms'.format(
+                name, result['p95_ms'], previous['p95_ms']))
+        if previous['throughput'] and result['throughput'] < previous['throughput'] * (1 - threshold):
+            regressions.append('{}: {:.0f} req/s vs baseline {:.0f} req/s'.format(
+                name, result['throughput'], previous['throughput']))
+        if result['queries_per_request'] > previous['queries_per_request']:
+            regressions.append('{}: {:.1f} queries/request vs baseline {:.1f}'.format(
+                name, result['queries_per_request'], previous['queries_per_request']))
+    return regressions
+
+
+SERVER_CONNECTIONS_SQL = ("SELECT count(*) FROM pg_stat_activity "
+                          "WHERE datname = current_database() AND backend_type = 'client backend'")
+
+
+def count_server_connections():
+    """
+    Connections Postgres itself holds for this database, whether the app
+    connects directly or through pgbouncer
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SERVER_CONNECTIONS_SQL)
+        return cursor.fetchone()[0]
+
+
+def _connection_worker(iterations, only, context, results):
+    suite, _ = run_suite(iterations, warmup=0, only=only, context=context)
+    connections.close_all()
+    results.put(sum(result['requests'] for result in suite.values()))
+
+
+def run_connection_benchmark(workers=4, iterations=100, only=None, interval=0.1, context=None):
+    """
+    Replay the suite from `workers` forked processes at once, the way gunicorn
+    or Celery workers share the database, while sampling Postgres's connection
+    count
+    :param context: from prepare_context, which is called when omitted; the
+        workers share it so they log in with the same password
+    :return: dict with peak and mean server connections and total throughput
+    :raises RuntimeError: when a worker fails; all workers are stopped first
+    """
+    context = context or prepare_context()
+    connections.close_all()
+    totals = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_connection_worker, args=(iterations, only, context, totals))
+                 for _ in range(workers)]
+    start = time.perf_counter()
+    samples = []
+    try:
+        for process in processes:
+            process.start()
+        while any(process.is_alive() for process in processes):
+            # leave this process's own connection out of the count
+            samples.append(count_server_connections() - 1)
+            connections.close_all()
+            time.sleep(interval)
+        elapsed = time.perf_counter() - start
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            if process.pid is not None:
+                process.join()
+    failed = [process.exitcode for process in processes if process.exitcode != 0]
+    if failed:
+        raise RuntimeError('{} of {} benchmark workers failed, exit codes {}'.format(len(failed), workers, failed))
+    requests = 0
+    for _ in processes:
+        try:
+            requests += totals.get(timeout=5)
+        except queue.Empty:
+            raise RuntimeError('a benchmark worker exited without reporting its requests')
+    return OrderedDict([
+        ('workers', workers),
+        ('peak_connections', max(samples) if samples else 0),
+        ('mean_connections', float(sum(samples)) / len(samples) if samples else 0),
+        ('requests', requests),
+        ('throughput', requests / elapsed if elapsed else None),
+    ])
+
+
+def _http_request(url, token, timeout):
+    request = urllib.request.Request(url, headers={'Authorization': 'Token ' + token})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return time.perf_counter() - start, status
+
+
+def run_http_benchmark(base_url, concurrency=16, requests=500, only=None, timeout=30, context=None):
+    """
+    Load a running server over HTTP with `concurrency` clients, to compare
+    server runtimes (gunicorn worker classes, counts) rather than the code.
+    Only GET scenarios are replayed so runs do not pile up rows. Any response
+    outside 2xx, or none at all, counts as an error
+    :param base_url: e.g. http://localhost:5000
+    :param context: from prepare_context, which is called when omitted
+    :return: results dict of name -> result, like run_suite
+    """
+    context = context or prepare_context()
+    results = OrderedDict()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for scenario in SCENARIOS:
+            if scenario.method != 'GET' or (only and scenario.name not in only):
+                continue
+            path = resolve(scenario, context)
+            params = scenario.params(context) if scenario.params else None
+            if path is None or (params and None in params.values()):
+                continue
+            url = base_url.rstrip('/') + path + ('?' + urllib.parse.urlencode(params) if params else '')
+            start = time.perf_counter()
+            outcomes = list(pool.map(lambda _: _http_request(url, context['token'], timeout), range(requests)))
+            elapsed = time.perf_counter() - start
+            timings = sorted(timing for timing, _ in outcomes)
+            results[scenario.name] = OrderedDict([
+                ('requests', requests),
+                ('concurrency', concurrency),
+                ('throughput', requests / elapsed),
+                ('p50_ms', percentile(timings, 0.50) * 1000),
+                ('p95_ms', percentile(timings, 0.95) * 1000),
+                ('p99_ms', percentile(timings, 0.99) * 1000),
+                ('errors', sum(1 for _, status in outcomes if status is None or not 200 <= status < 300)),
+                ('status_codes', sorted(set(status for _, status in outcomes if status is not None))),
+            ])
+    return results
@@ -0,0 +1,232 @@
+"""
+Generation based read-through cache.
+
+Every cached read lives under a namespace (e.g. 'channels'). The namespace has a
+generation number stored in the cache; it is part of every key written for that
+namespace, so bumping it after a write commits orphans all old entries at once without
+scanning or deleting anything. Orphans simply age out of Redis.
+
+LocalTTLCache is a small in-process layer for hot per-user lookups that sits in
+front of Redis.
+
+Hit/miss counters on hot paths go through count(), which buffers them per
+process and flushes to the shared counters every COUNTER_FLUSH_INTERVAL
+seconds, so a hit costs no extra round trip.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_NAMESPACES = ('videos', 'channels', 'sub_channels', 'seasons', 'tags')
+
+GENERATION_KEY = 'gen:{}'
+MODIFIED_KEY = 'gen-modified:{}'
+ENTRY_KEY = 'read:{}:{}:{}'
+COUNTER_KEY = 'counter:{}'
+
+
+def _initial_generation():
+    # Seeding from the clock means a generation key evicted from Redis never
+    # comes back at a number an older entry was written under.
+    return int(time.time() * 1000)
+
+
+def incr_counter(name, delta=1):
+    """
+    Increment a shared counter, creating it on first use
+    :param name: counter name
+    :param delta: amount to add
+    """
+    key = COUNTER_KEY.format(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+_pending = Counter()
+_pending_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def count(name, delta=1):
+    """
+    Buffered incr_counter. Up to COUNTER_FLUSH_INTERVAL seconds of counts are
+    lost if the process dies, acceptable for statistics
+    :param name: counter name
+    :param delta: amount to add
+    """
+    with _pending_lock:
+        _pending[name] += delta
+        due = time.monotonic() - _flushed_at >= settings.COUNTER_FLUSH_INTERVAL
+    if due:
+        flush_counters()
+
+
+def flush_counters():
+    """
+    Write this process's buffered counts to the shared counters
+    """
+    global _flushed_at
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _flushed_at = time.monotonic()
+    for name, delta in pending.items():
+        if delta:
+            incr_counter(name, delta)
+
+
+def get_counters(names):
+    """
+    Read several counters in one round trip
+    :param names: iterable of counter names
+    :return: dict of name -> int
+    """
+    names = list(names)
+    values = cache.get_many([COUNTER_KEY.format(name) for name in names])
+    return {name: values.get(COUNTER_KEY.format(name), 0) for name in names}
+
+
+def get_generations(namespaces):
+    """
+    Current generation of each namespace, initialising missing ones
+    :param namespaces: iterable of namespace names
+    :return: dict of namespace -> int
+    """
+    namespaces = list(namespaces)
+    keys = {GENERATION_KEY.format(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    generations = {}
+    for key, namespace in keys.items():
+        generation = found.get(key)
+        if generation is None:
+            generation = _initial_generation()
+            if not cache.add(key, generation, None):
+                generation = cache.get(key, generation)
+        generations[namespace] = generation
+    return generations
+
+
+def get_generation(namespace):
+    return get_generations([namespace])[namespace]
+
+
+def get_last_modified(namespaces):
+    """
+    Unix time of the most recent bump across namespaces, or None if never bumped
+    :param namespaces: iterable of namespace names
+    """
+    found = cache.get_many([MODIFIED_KEY.format(namespace) for namespace in namespaces])
+    return max(found.values()) if found else None
+
+
+def bump_generation(*namespaces):
+    """
+    Invalidate every cached read in the given namespaces. Call after a write
+    has committed (transaction.on_commit), never inside its transaction
+    :param namespaces: namespace names
+    """
+    now = time.time()
+    for namespace in namespaces:
+        key = GENERATION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, _initial_generation(), None):
+                cache.incr(key)
+    cache.set_many({MODIFIED_KEY.format(namespace): now for namespace in namespaces}, None)
+
+
+def cached_read(namespace, key, loader, timeout=None):
+    """
+    Return the cached value for key in namespace, calling loader on a miss
+    :param namespace: namespace whose generation guards this entry
+    :param key: string identifying the read inside the namespace
+    :param loader: zero argument callable producing the value
+    :param timeout: seconds to keep the entry, defaults to READ_CACHE_TIMEOUT
+    :return: the cached or freshly loaded value
+    """
+    if timeout is None:
+        timeout = settings.READ_CACHE_TIMEOUT
+    entry_key = ENTRY_KEY.format(namespace, get_generation(namespace), key)
+    # values are boxed so a cached None is distinguishable from a miss
+    boxed = cache.get(entry_key)
+    if boxed is not None:
+        count('{}:hits'.format(namespace))
+        return boxed[0]
+    count('{}:misses'.format(namespace))
+    value = loader()
+    cache.set(entry_key, (value,), timeout)
+    return value
+
+
+def cache_stats(namespaces=CATALOG_NAMESPACES):
+    """
+    Hit and miss counters per namespace, including this process's unflushed counts
+    :param namespaces: namespaces to report on
+    :return: dict of namespace -> {'hits', 'misses', 'hit_ratio'}
+    """
+    flush_counters()
+    names = []
+    for namespace in namespaces:
+        names += ['{}:hits'.format(namespace), '{}:misses'.format(namespace)]
+    counters = get_counters(names)
+    stats = {}
+    for namespace in namespaces:
+        hits = counters['{}:hits'.format(namespace)]
+        misses = counters['{}:misses'.format(namespace)]
+        total = hits + misses
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': float(hits) / total if total else None,
+        }
+    return stats
+
+
+class LocalTTLCache(object):
+    """
+    Bounded, thread-safe, in-process LRU whose entries expire after ttl seconds.
+    Other processes are not told about deletes, so keep ttl short.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
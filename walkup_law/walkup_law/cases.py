@@ -0,0 +1,59 @@
+"""
+Case docket queries. Lookups are served from the unique case_number index and
+the (attorney, is_open, case_number) index on Case.
+"""
+from django.db.models import Count, Q, Window
+
+from walkup_law.walkup_law.models import Case
+
+CASE_FIELDS = ('id', 'case_number', 'attorney', 'is_open')
+STATUS_FILTERS = {
+    'open': Q(is_open=True),
+    'closed': Q(is_open=False),
+    'all': Q(),
+}
+
+
+def get_case_by_number(case_number):
+    """
+    :param case_number: docket number
+    :return: Case or None
+    """
+    return Case.objects.filter(case_number=case_number).first()
+
+
+def attorney_caseload(attorney, status='open', limit=25, offset=0):
+    """
+    One page of an attorney's cases plus totals, from a single query. The totals
+    are window aggregates over the filtered set, so they are computed before
+    LIMIT/OFFSET apply
+    :param attorney: attorney name as stored on Case
+    :param status: 'open', 'closed' or 'all'
+    :param limit: page size
+    :param offset: rows to skip
+    :return: dict with count, open_count and results
+    """
+    queryset = (
+        Case.objects
+        .filter(STATUS_FILTERS[status], attorney=attorney)
+        .annotate(total=Window(expression=Count('id')),
+                  open_total=Window(expression=Count('id', filter=Q(is_open=True))))
+        .order_by('case_number')
+        .values(*CASE_FIELDS + ('total', 'open_total'))
+    )
+    rows = list(queryset[offset:offset + limit])
+    if rows:
+        count, open_count = rows[0]['total'], rows[0]['open_total']
+    elif offset:
+        # past the last page: no row carries the window totals
+        totals = Case.objects.filter(STATUS_FILTERS[status], attorney=attorney).aggregate(
+            total=Count('id'), open_total=Count('id', filter=Q(is_open=True)))
+        count, open_count = totals['total'], totals['open_total']
+    else:
+        count, open_count = 0, 0
+    return {
+        'attorney': attorney,
+        'count': count,
+        'open_count': open_count,
+        'results': [{field: row[field] for field in CASE_FIELDS} for row in rows],
+    }
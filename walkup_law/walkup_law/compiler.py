@@ -0,0 +1,111 @@
+"""
+Compiles a Form with its ordered QuestionGroups and Questions into one JSON
+document. Kiosks read the compiled document instead of walking the relations.
+Compiled rows are only marked stale (see signals.py) when a member of that form
+changes, and are recompiled lazily on the next read.
+"""
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Prefetch
+
+from walkup_law.walkup_law.cache import bump_generation, cached_read
+from walkup_law.walkup_law.models import CompiledForm, Form, Question, QuestionGroup
+
+FORM_NAMESPACE = 'form:{form_id}'
+
+
+def form_namespace(form_id):
+    return FORM_NAMESPACE.format(form_id=form_id)
+
+
+def build_schema(form, version):
+    """
+    Flatten form into a schema document using two queries
+    :param form: Form instance
+    :param version: version number stamped into the document
+    :return: dict
+    """
+    questions = Prefetch('question_set', queryset=Question.objects.order_by('question_number', 'id'))
+    groups = form.questiongroup_set.order_by('group_number', 'id').prefetch_related(questions)
+    return {
+        'form': form.pk,
+        'title': form.title,
+        'version': version,
+        'groups': [
+            {
+                'id': group.pk,
+                'title': group.title,
+                'group_number': group.group_number,
+                'questions': [
+                    {
+                        'id': question.pk,
+                        'text': question.text,
+                        'question_number': question.question_number,
+                        'required': question.required,
+                    }
+                    for question in group.question_set.all()
+                ],
+            }
+            for group in groups
+        ],
+    }
+
+
+def compile_form(form_id):
+    """
+    Build and store a new version of the form's schema. The namespace was
+    already bumped when the row went stale, so the cache is not touched here
+    :param form_id: primary key of the Form
+    :return: the saved CompiledForm
+    """
+    with transaction.atomic():
+        form = Form.objects.get(pk=form_id)
+        compiled, _ = CompiledForm.objects.select_for_update().get_or_create(form=form)
+        compiled.version += 1
+        compiled.schema = build_schema(form, compiled.version)
+        compiled.stale = False
+        compiled.save()
+    return compiled
+
+
+def get_compiled_schema(form_id):
+    """
+    The current schema of a form, from cache, else its stored row, else compiled
+    :param form_id: primary key of the Form
+    :return: schema dict
+    :raises Form.DoesNotExist:
+    """
+    def load():
+        # the entry is stored under the current generation, so it must not be
+        # filled from a replica that has not replayed the edit behind it yet
+        compiled = CompiledForm.objects.using(DEFAULT_DB_ALIAS).filter(form_id=form_id).first()
+        if compiled is None or compiled.stale:
+            compiled = compile_form(form_id)
+        return compiled.schema
+
+    return cached_read(form_namespace(form_id), 'schema', load)
+
+
+def invalidate_forms(form_ids):
+    """
+    Mark compiled schemas stale in the current transaction, so they commit or
+    roll back with the change that caused them, and bump their namespaces once
+    it commits. Bumping earlier would let a concurrent read still see the old
+    committed row and cache it under the new generation
+    :param form_ids: iterable of Form primary keys
+    """
+    form_ids = set(form_ids)
+    if not form_ids:
+        return
+    CompiledForm.objects.filter(form_id__in=form_ids).update(stale=True)
+    namespaces = [form_namespace(form_id) for form_id in form_ids]
+    transaction.on_commit(lambda: bump_generation(*namespaces))
+
+
+def forms_for_groups(group_ids):
+    """
+    Primary keys of forms that include any of the given question groups
+    :param group_ids: iterable of QuestionGroup primary keys
+    :return: list of Form primary keys
+    """
+    through = QuestionGroup.form.through
+    return list(through.objects.filter(questiongroup_id__in=group_ids).values_list('form_id', flat=True))
@@ -0,0 +1,63 @@
+"""
+Connection health for persistent connections, which matters most behind an
+external pooler. With DATABASE_POOL_MODE=transaction the app talks to
+pgbouncer, which hands out a server connection per transaction:
+
+- server-side cursors (queryset.iterator()) would outlive their transaction,
+  so DISABLE_SERVER_SIDE_CURSORS is set on every database
+- psycopg2 interpolates parameters client side and never PREPAREs, so
+  statements are safe to run on whichever server connection pgbouncer picks
+- session state (SET, advisory locks, LISTEN) must not be relied on; Django
+  only issues SET TIME ZONE when the server's zone differs from TIME_ZONE
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+_checked = threading.local()
+
+
+def check_connections(**kwargs):
+    """
+    request_started / task_prerun receiver. Close this thread's persistent
+    connections that stopped answering, e.g. after a pgbouncer or failover
+    restart, so the request reconnects instead of failing. Each connection is
+    pinged at most every DATABASE_HEALTH_CHECK_INTERVAL seconds.
+    """
+    interval = settings.DATABASE_HEALTH_CHECK_INTERVAL
+    if interval <= 0:
+        return
+    now = time.monotonic()
+    for conn in connections.all():
+        if conn.connection is None or conn.in_atomic_block:
+            continue
+        if now - getattr(_checked, conn.alias, 0) < interval:
+            continue
+        setattr(_checked, conn.alias, now)
+        if not conn.is_usable():
+            conn.close()
+
+
+def database_health():
+    """
+    Ping every configured database and the cache
+    :return: dict of name -> True/False
+    """
+    health = {}
+    for alias in settings.DATABASES:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            health[alias] = True
+        except DatabaseError:
+            connections[alias].close()
+            health[alias] = False
+    try:
+        cache.set('health-check', 1, 10)
+        health['cache'] = cache.get('health-check') == 1
+    except Exception:
+        health['cache'] = False
+    return health
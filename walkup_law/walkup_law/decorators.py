@@ -0,0 +1,80 @@
+import datetime
+from functools import wraps
+
+from django.db import transaction
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from walkup_law.walkup_law.cache import get_generations, get_last_modified
+from walkup_law.walkup_law.routers import replica_reads
+
+
+def versioned_condition(*namespaces):
+    """
+    Conditional GET driven by read-cache generations instead of the response body.
+
+    The ETag is built from the generation numbers of the given namespaces and
+    Last-Modified from the time they were last bumped, so a matching
+    If-None-Match / If-Modified-Since is answered with 304 from two cache reads,
+    before authentication, the queryset or the serializer run. A 304 carries no
+    body, so skipping authentication leaks nothing.
+
+    Namespaces may contain format fields filled from the URL kwargs, e.g.
+    'form:{form_id}'. Place the decorator above @api_view.
+    :param namespaces: cache namespaces the view's response depends on
+    """
+    def resolve(kwargs):
+        return [namespace.format(**kwargs) for namespace in namespaces]
+
+    def etag_func(request, *args, **kwargs):
+        resolved = resolve(kwargs)
+        generations = get_generations(resolved)
+        return '-'.join(str(generations[namespace]) for namespace in resolved)
+
+    def last_modified_func(request, *args, **kwargs):
+        stamp = get_last_modified(resolve(kwargs))
+        if stamp is None:
+            return None
+        return datetime.datetime.fromtimestamp(stamp, tz=timezone.utc)
+
+    return condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+
+# Transaction policies. ATOMIC_REQUESTS stays on as the fallback, so a view
+# without a policy (admin, djoser) still runs in one transaction per request.
+READ_ONLY = 'read_only'
+WRITE = 'write'
+
+
+def read_only(view):
+    """
+    Run the view in autocommit instead of the per-request transaction, so list
+    and detail reads pay no BEGIN/COMMIT and hold no snapshot for the length of
+    the response. Its reads may be served by a replica (see routers.py);
+    writes the view makes anyway go to the primary and must bring their own
+    atomic(). Place the decorator outermost.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    wrapped = transaction.non_atomic_requests(wrapped)
+    wrapped.transaction_policy = READ_ONLY
+    return wrapped
+
+
+def write(view):
+    """
+    Run the view in one transaction whatever ATOMIC_REQUESTS is set to.
+    Place the decorator outermost.
+    """
+    view = transaction.non_atomic_requests(transaction.atomic(view))
+    view.transaction_policy = WRITE
+    return view
+
+
+def transaction_policy(view):
+    """
+    :return: READ_ONLY or WRITE for a decorated view, else None
+    """
+    return getattr(view, 'transaction_policy', None)
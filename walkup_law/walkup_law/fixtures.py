@@ -0,0 +1,164 @@
+"""
+Deterministic load-data generator. Rows are produced by generators and written
+with bulk_create in fixed-size batches, so memory stays flat and the same seed
+always yields the same dataset. Every row has a natural key derived from the
+seed (username, case number, form title); each batch skips the keys that are
+already stored, so running a seed again only adds what is missing. Dates are
+relative to a fixed epoch rather than the clock unless a `now` is given.
+"""
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law.models import Case, Form, Question, QuestionGroup
+
+FIRST_NAMES = ('Ana', 'Ben', 'Carla', 'Dev', 'Elif', 'Femi', 'Grace', 'Hugo', 'Ines', 'Jamal', 'Kenji', 'Lena',
+               'Marco', 'Nadia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sami', 'Tara')
+LAST_NAMES = ('Alvarez', 'Brooks', 'Chen', 'Diallo', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ivanova', 'Jones',
+              'Kim', 'Lopez', 'Mensah', 'Nguyen', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Walker')
+GROUP_TITLES = ('Contact details', 'Household', 'Income', 'Tenancy', 'Employment', 'Immigration status',
+                'Prior proceedings', 'Documents')
+QUESTION_STEMS = ('What is your', 'When did you last update your', 'Do you have a copy of your',
+                  'Who else is listed on your', 'How long have you had your')
+QUESTION_SUBJECTS = ('lease', 'pay stub', 'court notice', 'address', 'employer', 'visa', 'bank statement')
+
+# 2018-03-01 UTC
+FIXTURE_EPOCH = 1519862400
+# seed s numbers its cases s * CASES_PER_SEED + 1 onwards
+CASES_PER_SEED = 1000000
+
+
+def _batched(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _new_rows(model, field, batch, key=None):
+    """
+    The rows of batch whose natural key, stored in model.<field>, is not in
+    the table yet
+    :param key: function of a row returning its key, defaults to row.<field>
+    """
+    key = key or (lambda row: getattr(row, field))
+    existing = set(model.objects.filter(**{field + '__in': [key(row) for row in batch]})
+                   .values_list(field, flat=True))
+    return [row for row in batch if key(row) not in existing]
+
+
+def _bulk_create(model, rows, batch_size, natural_key=None):
+    """
+    :param natural_key: field identifying a row; rows already stored are skipped
+    :return: number of rows created
+    """
+    created = 0
+    for batch in _batched(rows, batch_size):
+        if natural_key is not None:
+            batch = _new_rows(model, natural_key, batch)
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def _full_name(rng):
+    return '{} {}'.format(rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))
+
+
+def generate_users(rng, count, seed, now=FIXTURE_EPOCH):
+    """
+    Users fixture-<seed>-0 .. fixture-<seed>-<count - 1>
+    """
+    # hashing is the slow part of creating users, so every fixture user shares one hash
+    password = make_password('password')
+    for n in range(count):
+        subscribed = rng.random() < 0.3
+        name = _full_name(rng)
+        offset = rng.randint(-30, 30) * 86400
+        username = 'fixture-{}-{}'.format(seed, n)
+        yield User(
+            username=username,
+            email='{}@example.com'.format(username),
+            name=name,
+            password=password,
+            stripe_customer_id='cus_fixture_{}_{}'.format(seed, n) if subscribed else '',
+            stripe_subscription_paid_through=now + offset if subscribed else None,
+        )
+
+
+def generate_cases(rng, count, seed, attorneys):
+    """
+    Cases numbered seed * CASES_PER_SEED + 1 onwards
+    """
+    first_number = seed * CASES_PER_SEED + 1
+    for number in range(first_number, first_number + min(count, CASES_PER_SEED)):
+        yield Case(case_number=number, attorney=rng.choice(attorneys), is_open=rng.random() < 0.7)
+
+
+def generate_forms(rng, count, seed):
+    """
+    Forms titled "Intake form <seed>-<n>", each with its groups and, per
+    group, (question_number, required, text) tuples
+    :return: generator of (Form, [(QuestionGroup, [question tuple])])
+    """
+    for n in range(count):
+        groups = []
+        for number, title in enumerate(rng.sample(GROUP_TITLES, rng.randint(3, 6)), 1):
+            questions = [(question_number, rng.random() < 0.5,
+                          '{} {}?'.format(rng.choice(QUESTION_STEMS), rng.choice(QUESTION_SUBJECTS)))
+                         for question_number in range(1, rng.randint(3, 8) + 1)]
+            groups.append((QuestionGroup(title=title, group_number=number), questions))
+        yield Form(title='Intake form {}-{}'.format(seed, n)), groups
+
+
+def create_forms(rng, count, seed, batch_size):
+    """
+    Store the forms of generate_forms that do not exist yet, batch_size forms
+    with their groups and questions at a time
+    :return: number of questions created
+    """
+    created = 0
+    for batch in _batched(generate_forms(rng, count, seed), batch_size):
+        batch = _new_rows(Form, 'title', batch, key=lambda item: item[0].title)
+        Form.objects.bulk_create([form for form, _ in batch])
+        groups = [(form, group, questions) for form, form_groups in batch for group, questions in form_groups]
+        _bulk_create(QuestionGroup, (group for _, group, _ in groups), batch_size)
+        links = (QuestionGroup.form.through(form_id=form.pk, questiongroup_id=group.pk)
+                 for form, group, _ in groups)
+        _bulk_create(QuestionGroup.form.through, links, batch_size)
+        questions = (Question(question_group=group, question_number=number, required=required, text=text)
+                     for _, group, group_questions in groups for number, required, text in group_questions)
+        created += _bulk_create(Question, questions, batch_size)
+    return created
+
+
+def create_fixtures(users=10, cases=100, forms=2, attorneys=20, seed=0, batch_size=5000, now=FIXTURE_EPOCH):
+    """
+    Generate a user, case and intake form dataset
+    :param users: users to create
+    :param cases: cases to create, at most CASES_PER_SEED
+    :param forms: intake forms, each with 3-6 question groups of 3-8 questions
+    :param attorneys: size of the attorney pool cases are spread across
+    :param seed: random seed, the same seed produces the same rows
+    :param batch_size: rows per INSERT
+    :param now: unix time subscription dates are spread around
+    :return: dict of model name -> rows created
+    """
+    # one generator per kind of row, so a row does not change with the counts of the others
+    def rng(kind):
+        return random.Random('{}:{}'.format(seed, kind))
+
+    attorney_rng = rng('attorneys')
+    attorney_pool = sorted({_full_name(attorney_rng) for _ in range(attorneys * 4)})[:attorneys]
+    with transaction.atomic():
+        return {
+            'users': _bulk_create(User, generate_users(rng('users'), users, seed, now), batch_size, 'username'),
+            'cases': _bulk_create(Case, generate_cases(rng('cases'), cases, seed, attorney_pool), batch_size,
+                                  'case_number'),
+            'questions': create_forms(rng('forms'), forms, seed, batch_size),
+        }
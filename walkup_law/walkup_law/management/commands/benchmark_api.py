@@ -0,0 +1,58 @@
+import json
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from walkup_law.walkup_law import benchmarks
+from walkup_law.walkup_law.fixtures import create_fixtures
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the API endpoints and compare against a JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--only', nargs='*', help='scenario names to run')
+        parser.add_argument('--seed-data', action='store_true',
+                            help='generate fixture users, cases and forms first')
+        parser.add_argument('--output', help='write results to this JSON file')
+        parser.add_argument('--baseline', help='fail when results regress against this JSON file')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='allowed fractional slowdown before failing')
+        parser.add_argument('--allow-create-user', action='store_true',
+                            help='create the staff benchmark user if missing, even with DEBUG off')
+        parser.add_argument('--atomic-requests', action='store_true',
+                            help='wrap every request in a transaction, as the global ATOMIC_REQUESTS did; '
+                                 'compare against a default run to see the gain of the per-view policy')
+
+    def handle(self, *args, **options):
+        if options['seed_data']:
+            create_fixtures(users=1000, cases=10000, forms=10)
+        try:
+            context = benchmarks.prepare_context(options['allow_create_user'])
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        results, skipped = benchmarks.run_suite(
+            options['iterations'], options['warmup'], options['only'], options['atomic_requests'], context)
+        for name, result in results.items():
+            sys.stdout.write('{:<20} {:>8.0f} req/s  p50 {:>7.2f}ms  p95 {:>7.2f}ms  p99 {:>7.2f}ms  '
+                             '{:>5.1f} queries  {}\r\n'.format(
+                                 name, result['throughput'], result['p50_ms'], result['p95_ms'],
+                                 result['p99_ms'], result['queries_per_request'], result['status_codes']))
+        for name in skipped:
+            sys.stdout.write('{:<20} skipped: endpoint or data not available\r\n'.format(name))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = benchmarks.compare(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+            sys.stdout.write('No regressions against {}\r\n'.format(options['baseline']))
@@ -0,0 +1,35 @@
+import sys
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from walkup_law.walkup_law import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Count Postgres connections while N worker processes replay the API benchmark'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16],
+                            help='worker counts to measure, one run each')
+        parser.add_argument('--iterations', type=int, default=100, help='requests per scenario per worker')
+        parser.add_argument('--allow-create-user', action='store_true',
+                            help='create the staff benchmark user if missing, even with DEBUG off')
+        parser.add_argument('--only', nargs='*', help='scenario names to run')
+
+    def handle(self, *args, **options):
+        try:
+            context = benchmarks.prepare_context(options['allow_create_user'])
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        sys.stdout.write('pool mode: {}, CONN_MAX_AGE: {}\r\n'.format(
+            settings.DATABASE_POOL_MODE or 'direct', settings.DATABASES['default'].get('CONN_MAX_AGE', 0)))
+        for workers in options['workers']:
+            try:
+                result = benchmarks.run_connection_benchmark(workers, options['iterations'], options['only'],
+                                                              context=context)
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            sys.stdout.write('{:>3} workers  peak {:>4} connections  mean {:>6.1f}  {:>8.0f} req/s\r\n'.format(
+                workers, result['peak_connections'], result['mean_connections'], result['throughput']))
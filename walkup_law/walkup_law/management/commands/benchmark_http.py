@@ -0,0 +1,44 @@
+import json
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from walkup_law.walkup_law import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Load a running server over HTTP, e.g. to compare gunicorn runtime profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:5000')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+        parser.add_argument('--only', nargs='*', help='scenario names to run')
+        parser.add_argument('--allow-create-user', action='store_true',
+                            help='create the staff benchmark user if missing, even with DEBUG off')
+        parser.add_argument('--label', default='', help='profile name to print and record')
+        parser.add_argument('--output', help='append results to this JSON file under --label')
+
+    def handle(self, *args, **options):
+        try:
+            context = benchmarks.prepare_context(options['allow_create_user'])
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        results = benchmarks.run_http_benchmark(
+            options['base_url'], options['concurrency'], options['requests'], options['only'], context=context)
+        for name, result in results.items():
+            sys.stdout.write('{:<12} {:<20} {:>8.0f} req/s  p50 {:>7.2f}ms  p95 {:>7.2f}ms  p99 {:>7.2f}ms  '
+                             '{} errors  {}\r\n'.format(
+                                 options['label'], name, result['throughput'], result['p50_ms'],
+                                 result['p95_ms'], result['p99_ms'], result['errors'], result['status_codes']))
+
+        if options['output']:
+            try:
+                with open(options['output']) as f:
+                    recorded = json.load(f)
+            except FileNotFoundError:
+                recorded = {}
+            recorded[options['label'] or 'default'] = results
+            with open(options['output'], 'w') as f:
+                json.dump(recorded, f, indent=2)
@@ -0,0 +1,39 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from walkup_law.walkup_law.serializers import ValuesPlan
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of a ModelSerializer against its ValuesPlan fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('serializer', help='dotted path to a flat ModelSerializer')
+        parser.add_argument('--rows', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        serializer_class = import_string(options['serializer'])
+        model = serializer_class.Meta.model
+        queryset = model.objects.order_by('pk')[:options['rows']]
+        plan = ValuesPlan(serializer_class)
+
+        rows = len(queryset)
+        if not rows:
+            sys.stdout.write('No {} rows to serialize\r\n'.format(model.__name__))
+            return
+
+        def measure(run):
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                run()
+            return rows * options['repeat'] / (time.perf_counter() - start)
+
+        slow = measure(lambda: serializer_class(list(queryset.all()), many=True).data)
+        fast = measure(lambda: plan.serialize(queryset.all()))
+        sys.stdout.write('{} rows x {} repeats\r\n'.format(rows, options['repeat']))
+        sys.stdout.write('serializer: {:.0f} rows/sec\r\n'.format(slow))
+        sys.stdout.write('values plan: {:.0f} rows/sec ({:.1f}x)\r\n'.format(fast, fast / slow))
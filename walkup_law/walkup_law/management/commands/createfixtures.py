@@ -1,12 +1,31 @@
 import sys
 from django.core.management.base import BaseCommand
-from walkup_law.walkup_law.fixtures import create_fixtures
+from walkup_law.walkup_law.fixtures import FIXTURE_EPOCH, create_fixtures
 
 class Command(BaseCommand):
 
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--cases', type=int, default=100)
+        parser.add_argument('--forms', type=int, default=2)
+        parser.add_argument('--attorneys', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--now', type=int, default=FIXTURE_EPOCH,
+                            help='unix time subscription dates are spread around, e.g. $(date +%%s)')
+
     def handle(self, *args, **options):
         sys.stdout.write('Create Fixtures\r\n')
-        create_fixtures()
+        created = create_fixtures(
+            users=options['users'],
+            cases=options['cases'],
+            forms=options['forms'],
+            attorneys=options['attorneys'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            now=options['now'],
+        )
+        for name, count in sorted(created.items()):
+            sys.stdout.write('{}: {}\r\n'.format(name, count))
         sys.stdout.write('fixtures created' + '\r\n')
         sys.stdout.write('=====================================' + '\r\n')
-
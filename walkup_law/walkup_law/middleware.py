@@ -0,0 +1,175 @@
+"""
+Per-endpoint database cost instrumentation, and read-your-writes pinning for
+the replica router.
+
+For a sampled fraction of requests every connection gets an execute_wrapper
+that counts queries, times them and fingerprints their SQL. The totals are
+added to shared counters keyed by the resolved URL name, and returned in a
+Server-Timing header to staff, or to anyone with DEBUG on. Repeated fingerprints within one request are reported as
+duplicates, the usual sign of an N+1 loop.
+"""
+import hashlib
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.urls import get_resolver
+
+from walkup_law.walkup_law import routers
+from walkup_law.walkup_law.cache import count, flush_counters, get_counters
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('requests', 'queries', 'sql_us', 'duplicate_queries', 'response_bytes')
+
+_IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Stable id for a statement regardless of IN-list length or inlined numbers
+    """
+    normalized = _SPACE.sub(' ', _NUMBER.sub('N', _IN_LIST.sub('(%s...)', sql))).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12], normalized
+
+
+class QueryCollector(object):
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+            key, normalized = fingerprint(sql)
+            self.fingerprints[key] += 1
+            self.statements.setdefault(key, normalized)
+
+    def duplicates(self):
+        """
+        :return: dict of fingerprint -> times seen, for statements run more than once
+        """
+        return {key: seen for key, seen in self.fingerprints.items() if seen > 1}
+
+
+class QueryInstrumentationMiddleware(object):
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = settings.QUERY_INSTRUMENTATION_SAMPLE_RATE
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        collector = QueryCollector()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(collector))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        url_name = getattr(getattr(request, 'resolver_match', None), 'url_name', None) or 'unresolved'
+        duplicates = collector.duplicates()
+        duplicate_count = sum(seen - 1 for seen in duplicates.values())
+        size = 0 if response.streaming else len(response.content)
+
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or getattr(user, 'is_staff', False):
+            response['Server-Timing'] = 'db;dur={:.2f};desc="{} queries", app;dur={:.2f}'.format(
+                collector.seconds * 1000, collector.count, elapsed * 1000)
+        self.record(url_name, collector, duplicate_count, size)
+
+        for key, seen in duplicates.items():
+            if seen >= settings.QUERY_INSTRUMENTATION_DUPLICATE_LIMIT:
+                logger.warning('%s ran the same query %d times: %s', url_name, seen, collector.statements[key])
+        return response
+
+    def record(self, url_name, collector, duplicate_count, size):
+        count('queries:{}:requests'.format(url_name))
+        count('queries:{}:queries'.format(url_name), collector.count)
+        count('queries:{}:sql_us'.format(url_name), int(collector.seconds * 1000000))
+        count('queries:{}:duplicate_queries'.format(url_name), duplicate_count)
+        count('queries:{}:response_bytes'.format(url_name), size)
+
+
+def query_stats(url_names=None):
+    """
+    Aggregated counters of sampled requests per URL name
+    :param url_names: names to report on, defaults to every named route
+    :return: dict of url name -> metrics, only for names that were sampled
+    """
+    flush_counters()
+    if url_names is None:
+        url_names = sorted(key for key in get_resolver().reverse_dict.keys() if isinstance(key, str))
+        url_names.append('unresolved')
+    counters = get_counters('queries:{}:{}'.format(name, metric) for name in url_names for metric in METRICS)
+    stats = {}
+    for name in url_names:
+        metrics = {metric: counters['queries:{}:{}'.format(name, metric)] for metric in METRICS}
+        requests = metrics['requests']
+        if not requests:
+            continue
+        stats[name] = {
+            'sampled_requests': requests,
+            'queries_per_request': float(metrics['queries']) / requests,
+            'sql_ms_per_request': metrics['sql_us'] / 1000.0 / requests,
+            'duplicate_queries_per_request': float(metrics['duplicate_queries']) / requests,
+            'response_bytes_per_request': float(metrics['response_bytes']) / requests,
+        }
+    return stats
+
+
+def client_key(request):
+    """
+    Identify the client across requests: its token, else its session cookie
+    :return: str, or None for anonymous clients without a session
+    """
+    credential = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return 'replica-pin:' + hashlib.sha1(credential.encode('utf-8')).hexdigest()
+
+
+class ReplicaPinningMiddleware(object):
+    """
+    Reads of a client that wrote in the last REPLICA_PIN_SECONDS go to the
+    primary, so they never see a replica that has not replayed the write yet
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        key = client_key(request)
+        routers.reset()
+        routers.pin_to_primary(bool(key and cache.get(key)))
+        try:
+            response = self.get_response(request)
+            if routers.has_written():
+                if key:
+                    cache.set(key, 1, settings.REPLICA_PIN_SECONDS)
+                user = getattr(request, 'user', None)
+                if user is not None and user.is_authenticated:
+                    routers.pin_user(user.pk)
+        finally:
+            routers.reset()
+        return response
@@ -4,8 +4,15 @@ from django.contrib.postgres.fields import JSONField
 from django.db import models
 
 class Case(models.Model):
-    case_number = models.IntegerField()
+    case_number = models.IntegerField(unique=True)
     attorney = models.CharField(max_length=50)
+    is_open = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # attorney dashboard: open cases for an attorney, ordered by number
+            models.Index(fields=['attorney', 'is_open', 'case_number']),
+        ]
 
 class Form(models.Model):
     title = models.CharField(max_length=50)
@@ -14,7 +21,57 @@ class Form(models.Model):
 class QuestionGroup(models.Model):
     form = models.ManyToManyField(Form)
     title = models.CharField(max_length=50)
-    group_number = models.AutoField()
+    group_number = models.PositiveIntegerField(default=0)
 
 class Question(models.Model):
-    question_group = models.ForeignKey(question_group)
\ No newline at end of file
+    question_group = models.ForeignKey(QuestionGroup, on_delete=models.CASCADE)
+    text = models.CharField(max_length=255)
+    question_number = models.PositiveIntegerField(default=0)
+    required = models.BooleanField(default=False)
+
+class CompiledForm(models.Model):
+    """
+    Flattened, versioned schema of a Form with its ordered groups and questions.
+    Rows are keyed by form so serving a schema is a single primary key read.
+    """
+    form = models.OneToOneField(Form, primary_key=True, on_delete=models.CASCADE, related_name='compiled')
+    version = models.PositiveIntegerField(default=0)
+    schema = JSONField(default=dict)
+    stale = models.BooleanField(default=False)
+    compiled_at = models.DateTimeField(auto_now=True)
+
+
+class AppendOnlyModel(models.Model):
+    """
+    Rows are written once and never updated. Corrections are new rows.
+    """
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("{} rows are append-only".format(self.__class__.__name__))
+        super().save(*args, **kwargs)
+
+class Submission(AppendOnlyModel):
+    """
+    One whole Form response for a Case, keyed by the client's submission id so
+    retries of the same payload are idempotent.
+    """
+    client_submission_id = models.UUIDField(unique=True)
+    case = models.ForeignKey(Case, on_delete=models.CASCADE)
+    form = models.ForeignKey(Form, on_delete=models.PROTECT)
+    form_version = models.PositiveIntegerField()
+    submitted_at = models.DateTimeField(auto_now_add=True)
+
+class Answer(AppendOnlyModel):
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='answers')
+    # denormalised from submission so a case's answers are read from one index range
+    case = models.ForeignKey(Case, on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, on_delete=models.PROTECT)
+    value = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['case', 'question']),
+        ]
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def _cursor_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def encode_cursor(values):
+    """
+    Turn the key values of the last row on a page into an opaque cursor
+    :param values: list of key values, datetimes are stored as isoformat
+    :return: urlsafe base64 string
+    """
+    payload = [_cursor_value(value) for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Inverse of encode_cursor
+    :param cursor: urlsafe base64 string
+    :return: list of key values, or None when the cursor is malformed
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeError, binascii.Error):
+        return None
+    if not isinstance(values, list):
+        return None
+    return values
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over an indexed, unique ordering key.
+
+    Each page is fetched with `WHERE (key) > (last seen key) ORDER BY key LIMIT n`,
+    so page 1000 costs the same as page 1. The total count is skipped unless the
+    client asks for it with `?count=1`.
+
+    Views may set `keyset_ordering` to override `ordering`. All fields must share a
+    direction and the last one must be unique, e.g. ('created', 'uuid') or
+    ('-created', '-id').
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 500
+    ordering = ('created', 'uuid')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        self.descending = self.ordering[0].startswith('-')
+        if any(field.startswith('-') != self.descending for field in self.ordering):
+            # the seek filter compares every field one way
+            raise ImproperlyConfigured(
+                "keyset ordering {} mixes ascending and descending fields".format(self.ordering))
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        position = None
+        if cursor:
+            position = decode_cursor(cursor)
+            if position is None or len(position) != len(self.fields):
+                raise NotFound(self.invalid_cursor_message)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.count()
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(queryset.model, position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_seek_filter(self, model, position):
+        """
+        Build the row-value comparison `(a, b) > (x, y)` as
+        `a > x OR (a = x AND b > y)`, which postgres can answer from the
+        composite index
+        """
+        lookup = 'lt' if self.descending else 'gt'
+        # cursors come from the client, a forged one must be a 404 and not a 500
+        try:
+            position = [model._meta.get_field(field).to_python(value)
+                        for field, value in zip(self.fields, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        seek = Q()
+        for i, field in enumerate(self.fields):
+            clause = Q(**{'{}__{}'.format(field, lookup): position[i]})
+            for prior_field, prior_value in zip(self.fields[:i], position[:i]):
+                clause &= Q(**{prior_field: prior_value})
+            seek |= clause
+        return seek
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [last[field] if isinstance(last, dict) else getattr(last, field) for field in self.fields]
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(values))
+
+    def get_paginated_response(self, data):
+        body = OrderedDict([('next', self.get_next_link())])
+        if self.count is not None:
+            body['count'] = self.count
+        body['results'] = data
+        return Response(body)
@@ -0,0 +1,142 @@
+"""
+Read-replica routing.
+
+Reads go to a replica only inside replica_reads(): the @read_only views enter
+it for the whole request, and reporting code can enter it directly. Everything
+else, and any read after a write or inside a transaction, stays on the primary.
+
+A client that wrote recently is pinned to the primary for
+REPLICA_PIN_SECONDS (see ReplicaPinningMiddleware), so a create followed by a
+list sees its own write. The pin is kept per credential and per user, so the
+first requests with a token created at login are pinned too. Replicas are
+health checked at most every REPLICA_HEALTH_CHECK_INTERVAL seconds per
+process; one that is down or lags by more than REPLICA_MAX_LAG seconds is
+skipped until the next check.
+
+Loaders that fill generation-keyed caches (cache.cached_read) must read the
+primary with .using(DEFAULT_DB_ALIAS): the generation is bumped on commit, so
+a lagging replica would store pre-edit data under the new generation for
+every client, not just the one that wrote.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+# alias -> (checked at, healthy), per process
+_health = {}
+
+USER_PIN_KEY = 'replica-pin-user:{}'
+
+LAG_SQL = ("SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+           "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END")
+
+
+@contextmanager
+def replica_reads():
+    """
+    Allow reads in this block to be served by a healthy replica. Writes made
+    before the outermost block (an earlier task on a worker thread) do not count
+    """
+    previous = getattr(_state, 'replica_reads', False)
+    if not previous:
+        _state.written = False
+    _state.replica_reads = True
+    try:
+        yield
+    finally:
+        _state.replica_reads = previous
+
+
+def pin_to_primary(pinned=True):
+    """
+    Keep the rest of this thread's reads on the primary, e.g. for a client
+    that wrote within the pin window
+    """
+    _state.pinned = pinned
+
+
+def pin_user(user_id):
+    """
+    Keep the user's reads on the primary for REPLICA_PIN_SECONDS, whichever
+    credential the next requests carry
+    """
+    if settings.DATABASE_REPLICAS and user_id is not None:
+        cache.set(USER_PIN_KEY.format(user_id), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def apply_user_pin(user_id):
+    """
+    Pin this thread to the primary if the user wrote within the pin window.
+    Called by authentication once the user is known
+    """
+    if settings.DATABASE_REPLICAS and cache.get(USER_PIN_KEY.format(user_id)):
+        pin_to_primary()
+
+
+def has_written():
+    return getattr(_state, 'written', False)
+
+
+def reset():
+    _state.__dict__.clear()
+
+
+def check_replica(alias):
+    """
+    :return: True when the replica answers and its replay lag is within REPLICA_MAX_LAG
+    """
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        logger.warning('Replica %s is unreachable', alias, exc_info=True)
+        connections[alias].close()
+        return False
+    if lag is not None and lag > settings.REPLICA_MAX_LAG:
+        logger.warning('Replica %s is %.1f seconds behind', alias, lag)
+        return False
+    return True
+
+
+def replica_is_healthy(alias):
+    checked_at, healthy = _health.get(alias, (None, False))
+    now = time.monotonic()
+    if checked_at is None or now - checked_at >= settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        healthy = check_replica(alias)
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+class ReplicaRouter(object):
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'replica_reads', False):
+            return DEFAULT_DB_ALIAS
+        if getattr(_state, 'pinned', False) or has_written():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        healthy = [alias for alias in settings.DATABASE_REPLICAS if replica_is_healthy(alias)]
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
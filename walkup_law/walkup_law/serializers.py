@@ -1 +1,105 @@
-from rest_framework import serializers
\ No newline at end of file
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from rest_framework import serializers
+
+from walkup_law.walkup_law.models import Case
+
+
+class ValuesPlan(object):
+    """
+    Precompiled read-only plan for a ModelSerializer.
+
+    DRF builds each row by walking bound fields, resolving attributes on model
+    instances and checking for None. For flat serializers the same output can be
+    produced from `.values_list()` tuples, skipping model instantiation and the
+    per-field machinery. Only concrete, non-nested fields are supported; anything
+    else raises ImproperlyConfigured so callers fall back to the serializer.
+    File fields are refused too: their representation needs the FieldFile and
+    storage, not the stored name.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.sources = []
+        self.plan = []
+        opts = serializer_class.Meta.model._meta
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or '.' in field.source:
+                raise ImproperlyConfigured(
+                    "{}.{} has a dotted source".format(serializer_class.__name__, name))
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is None or not model_field.concrete:
+                raise ImproperlyConfigured(
+                    "{}.{} is not a concrete model field".format(serializer_class.__name__, name))
+            if isinstance(field, serializers.FileField) or isinstance(model_field, models.FileField):
+                raise ImproperlyConfigured(
+                    "{}.{} is a file field".format(serializer_class.__name__, name))
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                represent = field.pk_field.to_representation if field.pk_field else _identity
+            elif isinstance(field, (serializers.BaseSerializer, serializers.RelatedField,
+                                    serializers.ManyRelatedField, serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(
+                    "{}.{} is not a flat field".format(serializer_class.__name__, name))
+            else:
+                represent = field.to_representation
+            self.sources.append(field.source)
+            self.plan.append((name, represent))
+
+    def serialize(self, queryset):
+        """
+        Serialize a queryset, matching serializer_class(queryset, many=True).data
+        :param queryset: queryset of serializer_class.Meta.model
+        :return: list of OrderedDicts
+        """
+        plan = self.plan
+        return [
+            OrderedDict([(name, None if value is None else represent(value))
+                         for (name, represent), value in zip(plan, row)])
+            for row in queryset.values_list(*self.sources)
+        ]
+
+
+def _identity(value):
+    return value
+
+
+_plans = {}
+
+
+def fast_list_data(serializer_class, queryset):
+    """
+    Read-only list payload for serializer_class using a cached ValuesPlan
+    :param serializer_class: flat ModelSerializer subclass
+    :param queryset: rows to serialize
+    :return: list of OrderedDicts, JSON identical to the serializer's output
+    """
+    plan = _plans.get(serializer_class)
+    if plan is None:
+        plan = _plans[serializer_class] = ValuesPlan(serializer_class)
+    return plan.serialize(queryset)
+
+
+class SubmissionInputSerializer(serializers.Serializer):
+    client_submission_id = serializers.UUIDField()
+    form = serializers.IntegerField()
+    answers = serializers.DictField(child=serializers.CharField(allow_blank=True))
+
+    def validate_answers(self, value):
+        try:
+            return {int(question_id): answer for question_id, answer in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("answer keys must be question ids")
+
+
+class CaseSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Case
+        fields = ('id', 'case_number', 'attorney', 'is_open')
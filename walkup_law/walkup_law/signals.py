@@ -0,0 +1,47 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from walkup_law.walkup_law.compiler import forms_for_groups, invalidate_forms
+from walkup_law.walkup_law.models import Form, Question, QuestionGroup
+
+
+@receiver(post_save, sender=Form)
+@receiver(post_delete, sender=Form)
+def form_changed(sender, instance, **kwargs):
+    invalidate_forms([instance.pk])
+
+
+@receiver(post_save, sender=QuestionGroup)
+@receiver(pre_delete, sender=QuestionGroup)
+def question_group_changed(sender, instance, **kwargs):
+    # pre_delete: the group's form links are gone by post_delete
+    invalidate_forms(forms_for_groups([instance.pk]))
+
+
+@receiver(pre_save, sender=Question)
+def question_moving(sender, instance, **kwargs):
+    # remember the group a question leaves, its forms lose the question
+    instance._previous_question_group_id = None
+    if instance.pk is not None:
+        instance._previous_question_group_id = (Question.objects.filter(pk=instance.pk)
+                                                .values_list('question_group_id', flat=True).first())
+
+
+@receiver(post_save, sender=Question)
+@receiver(pre_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    group_ids = {instance.question_group_id, getattr(instance, '_previous_question_group_id', None)}
+    group_ids.discard(None)
+    invalidate_forms(forms_for_groups(group_ids))
+
+
+@receiver(m2m_changed, sender=QuestionGroup.form.through)
+def question_group_forms_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance is a Form
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_forms([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_forms(pk_set)
+    elif action == 'pre_clear':
+        invalidate_forms(forms_for_groups([instance.pk]))
@@ -0,0 +1,15 @@
+from walkup_law.taskapp.batch import batch_handler
+from walkup_law.walkup_law.compiler import compile_form
+from walkup_law.walkup_law.models import CompiledForm
+
+
+@batch_handler('recompile-forms')
+def recompile_stale_forms(start, end):
+    """
+    Recompile stale form schemas with primary keys in start..end
+    """
+    form_ids = list(CompiledForm.objects.filter(form_id__range=(start, end), stale=True)
+                    .values_list('form_id', flat=True))
+    for form_id in form_ids:
+        compile_form(form_id)
+    return len(form_ids)
@@ -0,0 +1,92 @@
+import uuid
+
+from django.core.cache import cache as django_cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from walkup_law.users import models as UM
+from walkup_law.walkup_law import answers
+from walkup_law.walkup_law.models import Answer, Case, Form, Question, QuestionGroup, Submission
+
+
+class AnswerStoreTests(APITestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.case = Case.objects.create(case_number=1001, attorney="Ortiz")
+        self.form = Form.objects.create(title="Eviction intake")
+        group = QuestionGroup.objects.create(title="Tenancy", group_number=1)
+        group.form.add(self.form)
+        self.rent = Question.objects.create(question_group=group, text="Monthly rent?", question_number=1,
+                                            required=True)
+        self.lease = Question.objects.create(question_group=group, text="Lease start?", question_number=2)
+
+    def test_submission_is_one_bulk_insert(self):
+        submission_id = uuid.uuid4()
+        answers.submit_answers(self.case.pk, self.form.pk, submission_id, {self.rent.pk: "1200"})
+
+        with CaptureQueriesContext(connection) as queries:
+            submission, created = answers.submit_answers(
+                self.case.pk, self.form.pk, uuid.uuid4(), {self.rent.pk: "900", self.lease.pk: "2017-01-01"})
+        answer_table = Answer._meta.db_table
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "{}"'.format(answer_table))]
+        self.assertEqual(len(inserts), 1)
+        self.assertTrue(created)
+        self.assertEqual(submission.answers.count(), 2)
+        self.assertEqual(submission.form_version, 1)
+
+    def test_resubmission_is_idempotent(self):
+        submission_id = uuid.uuid4()
+        first, created = answers.submit_answers(self.case.pk, self.form.pk, submission_id, {self.rent.pk: "1200"})
+        self.assertTrue(created)
+        second, created = answers.submit_answers(self.case.pk, self.form.pk, submission_id, {self.rent.pk: "1200"})
+        self.assertFalse(created)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Answer.objects.count(), 1)
+
+    def test_validation_against_schema(self):
+        with self.assertRaises(answers.SubmissionError) as raised:
+            answers.submit_answers(self.case.pk, self.form.pk, uuid.uuid4(), {self.lease.pk: "2017", 999999: "x"})
+        self.assertIn(str(self.rent.pk), raised.exception.errors)
+        self.assertIn("999999", raised.exception.errors)
+        self.assertEqual(Submission.objects.count(), 0)
+
+    def test_answers_are_append_only(self):
+        submission, _ = answers.submit_answers(self.case.pk, self.form.pk, uuid.uuid4(), {self.rent.pk: "1200"})
+        answer = submission.answers.get()
+        answer.value = "1300"
+        with self.assertRaises(ValueError):
+            answer.save()
+
+    def test_submit_endpoint(self):
+        user = UM.User.objects.create(username="kiosk", is_staff=True)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        url = reverse('submit-answers', kwargs={'case_id': self.case.pk})
+        payload = {"client_submission_id": str(uuid.uuid4()),
+                   "form": self.form.pk,
+                   "answers": {str(self.rent.pk): "1200"}}
+
+        response = self.client.post(url, data=payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(url, data=payload, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        payload["client_submission_id"] = str(uuid.uuid4())
+        payload["answers"] = {}
+        response = self.client.post(url, data=payload, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_clients_cannot_submit(self):
+        token = Token.objects.create(user=UM.User.objects.create(username="client"))
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.post(reverse('submit-answers', kwargs={'case_id': self.case.pk}),
+                                    data={"client_submission_id": str(uuid.uuid4()), "form": self.form.pk,
+                                          "answers": {str(self.rent.pk): "1200"}}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Submission.objects.count(), 0)
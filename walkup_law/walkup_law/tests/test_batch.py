@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from walkup_law.taskapp import batch
+from walkup_law.taskapp.models import BatchJob
+from walkup_law.walkup_law import compiler
+from walkup_law.walkup_law.models import CompiledForm, Form
+
+
+class TestBatchFramework(TestCase):
+
+    def setUp(self):
+        self.forms = [Form.objects.create(title="Form {}".format(i)) for i in range(5)]
+        for form in self.forms:
+            compiler.compile_form(form.pk)
+        CompiledForm.objects.update(stale=True)
+
+    def run_eagerly(self):
+        # chords run in-process instead of going through the broker
+        eager = batch.app.conf.CELERY_ALWAYS_EAGER
+        batch.app.conf.CELERY_ALWAYS_EAGER = True
+        self.addCleanup(setattr, batch.app.conf, 'CELERY_ALWAYS_EAGER', eager)
+
+    def test_split_ranges(self):
+        self.assertEqual(batch.split_ranges(1, 10, 4), [(1, 4), (5, 8), (9, 10)])
+        self.assertEqual(batch.split_ranges(3, 3, 4), [(3, 3)])
+
+    def test_chunks_resume_where_they_stopped(self):
+        job = batch.create_batch('recompile-forms', 'walkup_law.Form', chunk_size=2)
+        self.assertEqual(len(job.ranges), 3)
+
+        # a worker finishes the first chunk and dies
+        batch.process_chunk.apply(args=(job.pk, 0))
+        progress = batch.batch_progress(job.pk)
+        self.assertEqual((progress['done'], progress['total'], progress['processed']), (1, 3, 2))
+        self.assertEqual(batch.pending_chunks(job), [1, 2])
+
+        # rerunning a finished chunk is a no-op
+        self.assertEqual(batch.process_chunk.apply(args=(job.pk, 0)).get(), 0)
+
+        for index in batch.pending_chunks(job):
+            batch.process_chunk.apply(args=(job.pk, index))
+        batch.finish_batch.apply(args=([], job.pk))
+
+        self.assertEqual(batch.batch_progress(job.pk)['status'], 'done')
+        self.assertFalse(CompiledForm.objects.filter(stale=True).exists())
+
+    def test_dispatch_runs_to_completion(self):
+        self.run_eagerly()
+        job_id = batch.start_batch('recompile-forms', 'walkup_law.Form', chunk_size=2)
+
+        self.assertEqual(batch.batch_progress(job_id),
+                         {'status': BatchJob.DONE, 'total': 3, 'done': 3, 'processed': 5})
+        self.assertFalse(CompiledForm.objects.filter(stale=True).exists())
+
+    def test_resume_after_failed_chunk(self):
+        job = batch.create_batch('recompile-forms', 'walkup_law.Form', chunk_size=2)
+        recompile = batch._handlers['recompile-forms']
+        failing_start = job.ranges[1][0]
+
+        def flaky(start, end):
+            if start == failing_start:
+                raise RuntimeError("worker lost its connection")
+            return recompile(start, end)
+
+        with mock.patch.dict(batch._handlers, {'recompile-forms': flaky}):
+            for index in range(len(job.ranges)):
+                batch.process_chunk.apply(args=(job.pk, index))
+        self.assertEqual(batch.pending_chunks(job), [1])
+        self.assertEqual(batch.batch_progress(job.pk)['status'], BatchJob.RUNNING)
+
+        self.run_eagerly()
+        self.assertEqual(batch.resume_batch(job.pk), 1)
+        self.assertEqual(batch.batch_progress(job.pk),
+                         {'status': BatchJob.DONE, 'total': 3, 'done': 3, 'processed': 5})
+        self.assertFalse(CompiledForm.objects.filter(stale=True).exists())
@@ -0,0 +1,62 @@
+import unittest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law import benchmarks
+
+
+def result(p95_ms, throughput, queries, status_codes=(200,)):
+    return {'p95_ms': p95_ms, 'throughput': throughput, 'queries_per_request': queries,
+            'status_codes': list(status_codes)}
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmarks.percentile(values, 0.50), 50)
+        self.assertEqual(benchmarks.percentile(values, 0.99), 99)
+        self.assertEqual(benchmarks.percentile([7], 0.95), 7)
+        self.assertIsNone(benchmarks.percentile([], 0.5))
+
+    def test_within_threshold_passes(self):
+        baseline = {'list-videos': result(10.0, 500, 3)}
+        self.assertEqual(benchmarks.compare({'list-videos': result(11.0, 450, 3)}, baseline, 0.2), [])
+
+    def test_regressions_are_reported(self):
+        baseline = {'list-videos': result(10.0, 500, 3)}
+        regressions = benchmarks.compare({'list-videos': result(13.0, 300, 4)}, baseline, 0.2)
+        self.assertEqual(len(regressions), 3)
+
+    def test_new_scenarios_are_not_regressions(self):
+        self.assertEqual(benchmarks.compare({'form-schema': result(5.0, 900, 0)}, {}, 0.2), [])
+
+    def test_error_statuses_fail(self):
+        # a fast 403 must not pass for an improvement
+        regressions = benchmarks.compare({'attorney-caseload': result(1.0, 5000, 1, (403,))}, {}, 0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('403', regressions[0])
+
+    def test_changed_statuses_fail(self):
+        baseline = {'create-video': result(10.0, 500, 3, (201,))}
+        regressions = benchmarks.compare({'create-video': result(10.0, 500, 3, (200, 201))}, baseline, 0.2)
+        self.assertEqual(len(regressions), 1)
+
+
+@override_settings(DEBUG=False)
+class TestPrepareContext(TestCase):
+
+    def test_refuses_to_create_the_user_by_default(self):
+        with self.assertRaises(ImproperlyConfigured):
+            benchmarks.prepare_context()
+        self.assertFalse(User.objects.filter(username=benchmarks.BENCHMARK_USERNAME).exists())
+
+    def test_password_is_random_per_run(self):
+        first = benchmarks.prepare_context(allow_create_user=True)
+        second = benchmarks.prepare_context()
+        self.assertNotEqual(first['password'], second['password'])
+        user = User.objects.get(username=benchmarks.BENCHMARK_USERNAME)
+        self.assertTrue(user.check_password(second['password']))
+        self.assertFalse(user.check_password(first['password']))
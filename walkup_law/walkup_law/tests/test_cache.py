@@ -0,0 +1,50 @@
+from django.core.cache import cache as django_cache
+from django.test import TestCase, override_settings
+
+from walkup_law.walkup_law import cache
+
+
+class TestReadThroughCache(TestCase):
+
+    def setUp(self):
+        cache.flush_counters()
+        django_cache.clear()
+        self.calls = 0
+
+    def loader(self):
+        self.calls += 1
+        return ["channel-{}".format(self.calls)]
+
+    def test_second_read_is_a_hit(self):
+        first = cache.cached_read('channels', 'list', self.loader)
+        second = cache.cached_read('channels', 'list', self.loader)
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        stats = cache.cache_stats(['channels'])['channels']
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=3600)
+    def test_hits_make_no_counter_round_trip(self):
+        cache.cached_read('channels', 'list', self.loader)
+        cache.cached_read('channels', 'list', self.loader)
+        self.assertEqual(cache.get_counters(['channels:hits'])['channels:hits'], 0)
+        self.assertEqual(cache.cache_stats(['channels'])['channels']['hits'], 1)
+
+    def test_bump_invalidates_only_its_namespace(self):
+        cache.cached_read('channels', 'list', self.loader)
+        cache.cached_read('videos', 'list', self.loader)
+        cache.bump_generation('channels')
+        self.assertEqual(cache.cached_read('channels', 'list', self.loader), ["channel-3"])
+        self.assertEqual(cache.cached_read('videos', 'list', self.loader), ["channel-2"])
+
+    def test_none_is_cached(self):
+        cache.cached_read('videos', 'missing', lambda: None)
+        self.assertIsNone(cache.cached_read('videos', 'missing', self.loader))
+        self.assertEqual(self.calls, 0)
+
+    def test_last_modified_follows_bumps(self):
+        self.assertIsNone(cache.get_last_modified(['seasons']))
+        cache.bump_generation('seasons')
+        self.assertIsNotNone(cache.get_last_modified(['seasons']))
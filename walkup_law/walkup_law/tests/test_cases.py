@@ -0,0 +1,76 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from walkup_law.users import models as UM
+from walkup_law.walkup_law import cases
+from walkup_law.walkup_law.models import Case
+
+
+class TestCaseQueries(TestCase):
+
+    def setUp(self):
+        for number in range(1, 8):
+            Case.objects.create(case_number=number, attorney="Ortiz", is_open=number % 3 != 0)
+        Case.objects.create(case_number=100, attorney="Nguyen")
+
+    def test_case_number_is_unique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Case.objects.create(case_number=1, attorney="Nguyen")
+
+    def test_get_case_by_number(self):
+        self.assertEqual(cases.get_case_by_number(100).attorney, "Nguyen")
+        self.assertIsNone(cases.get_case_by_number(404))
+
+    def test_caseload_page_and_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            caseload = cases.attorney_caseload("Ortiz", status='all', limit=3, offset=3)
+        self.assertEqual(caseload['count'], 7)
+        self.assertEqual(caseload['open_count'], 5)
+        self.assertEqual([row['case_number'] for row in caseload['results']], [4, 5, 6])
+
+    def test_caseload_open_only(self):
+        caseload = cases.attorney_caseload("Ortiz")
+        self.assertEqual(caseload['count'], 5)
+        self.assertTrue(all(row['is_open'] for row in caseload['results']))
+
+    def test_caseload_past_last_page(self):
+        caseload = cases.attorney_caseload("Ortiz", status='all', limit=5, offset=50)
+        self.assertEqual(caseload['count'], 7)
+        self.assertEqual(caseload['results'], [])
+
+
+class CaseViewTests(APITestCase):
+
+    def setUp(self):
+        Case.objects.create(case_number=42, attorney="Ortiz")
+        user = UM.User.objects.create(username="attorney", is_staff=True)
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def test_attorney_caseload(self):
+        response = self.client.get(reverse('attorney-caseload'), {'attorney': "Ortiz"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get(reverse('attorney-caseload'), {'attorney': "Ortiz", 'status': "pending"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_case_by_number(self):
+        response = self.client.get(reverse('case-by-number', kwargs={'case_number': 42}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['attorney'], "Ortiz")
+
+        response = self.client.get(reverse('case-by-number', kwargs={'case_number': 43}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_clients_cannot_read_cases(self):
+        token = Token.objects.create(user=UM.User.objects.create(username="client"))
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        response = self.client.get(reverse('attorney-caseload'), {'attorney': "Ortiz"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse('case-by-number', kwargs={'case_number': 42}))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from walkup_law.walkup_law import compiler, routers
+from walkup_law.walkup_law.models import CompiledForm, Form, Question, QuestionGroup
+
+
+# TransactionTestCase: invalidation runs on commit, which TestCase never reaches
+class TestFormCompiler(TransactionTestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.form = Form.objects.create(title="Eviction intake")
+        self.other_form = Form.objects.create(title="Wage claim intake")
+
+        self.household = QuestionGroup.objects.create(title="Household", group_number=2)
+        self.tenancy = QuestionGroup.objects.create(title="Tenancy", group_number=1)
+        self.household.form.add(self.form)
+        self.tenancy.form.add(self.form)
+
+        Question.objects.create(question_group=self.tenancy, text="Monthly rent?", question_number=2)
+        Question.objects.create(question_group=self.tenancy, text="Lease start?", question_number=1)
+        Question.objects.create(question_group=self.household, text="Occupants?", question_number=1)
+
+    def test_schema_is_ordered(self):
+        schema = compiler.get_compiled_schema(self.form.pk)
+        self.assertEqual(schema['version'], 1)
+        self.assertEqual([group['title'] for group in schema['groups']], ["Tenancy", "Household"])
+        self.assertEqual([question['text'] for question in schema['groups'][0]['questions']],
+                         ["Lease start?", "Monthly rent?"])
+
+    def test_cached_read_runs_no_queries(self):
+        compiler.get_compiled_schema(self.form.pk)
+        with self.assertNumQueries(0):
+            compiler.get_compiled_schema(self.form.pk)
+
+    def test_member_change_recompiles_only_that_form(self):
+        compiler.get_compiled_schema(self.form.pk)
+        compiler.get_compiled_schema(self.other_form.pk)
+
+        Question.objects.create(question_group=self.household, text="Any minors?", question_number=2)
+
+        self.assertTrue(CompiledForm.objects.get(form=self.form).stale)
+        self.assertFalse(CompiledForm.objects.get(form=self.other_form).stale)
+        schema = compiler.get_compiled_schema(self.form.pk)
+        self.assertEqual(schema['version'], 2)
+        self.assertEqual(len(schema['groups'][1]['questions']), 2)
+        self.assertEqual(compiler.get_compiled_schema(self.other_form.pk)['version'], 1)
+
+    def test_question_moved_between_groups(self):
+        compiler.get_compiled_schema(self.form.pk)
+        intake = QuestionGroup.objects.create(title="Intake", group_number=1)
+        intake.form.add(self.other_form)
+        compiler.get_compiled_schema(self.other_form.pk)
+
+        question = Question.objects.get(text="Occupants?")
+        question.question_group = intake
+        question.save()
+
+        schema = compiler.get_compiled_schema(self.form.pk)
+        self.assertNotIn("Occupants?", [question['text'] for group in schema['groups']
+                                         for question in group['questions']])
+        other = compiler.get_compiled_schema(self.other_form.pk)
+        self.assertEqual(other['groups'][0]['questions'][0]['text'], "Occupants?")
+
+    def test_edit_is_invalidated_only_after_commit(self):
+        compiler.get_compiled_schema(self.form.pk)
+        with transaction.atomic():
+            Question.objects.create(question_group=self.household, text="Any minors?", question_number=2)
+            # the row goes stale with the edit, but a read inside the window
+            # still gets the cached schema...
+            self.assertTrue(CompiledForm.objects.get(form=self.form).stale)
+            self.assertEqual(compiler.get_compiled_schema(self.form.pk)['version'], 1)
+
+        # ...and cannot pin it under the generation bumped on commit
+        schema = compiler.get_compiled_schema(self.form.pk)
+        self.assertEqual(schema['version'], 2)
+        self.assertEqual(len(schema['groups'][1]['questions']), 2)
+
+    def test_rolled_back_edit_leaves_schema_current(self):
+        compiler.get_compiled_schema(self.form.pk)
+        with mock.patch.object(compiler, 'bump_generation') as bump:
+            try:
+                with transaction.atomic():
+                    Question.objects.create(question_group=self.household, text="Any minors?", question_number=2)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        bump.assert_not_called()
+        self.assertFalse(CompiledForm.objects.get(form=self.form).stale)
+        self.assertEqual(compiler.get_compiled_schema(self.form.pk)['version'], 1)
+
+    @override_settings(DATABASE_REPLICAS=['replica0'])
+    @mock.patch.object(routers, 'replica_is_healthy', return_value=True)
+    def test_cache_fill_reads_primary(self, healthy):
+        # replica0 is not configured, so any read routed to it would raise
+        compiler.compile_form(self.form.pk)
+        with routers.replica_reads():
+            self.assertEqual(compiler.get_compiled_schema(self.form.pk)['form'], self.form.pk)
+
+    def test_group_removed_from_form(self):
+        compiler.get_compiled_schema(self.form.pk)
+        self.household.form.remove(self.form)
+        schema = compiler.get_compiled_schema(self.form.pk)
+        self.assertEqual([group['title'] for group in schema['groups']], ["Tenancy"])
+
+    def test_schema_endpoint_supports_etag(self):
+        url = reverse('form-schema', kwargs={'form_id': self.form.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['form'], self.form.pk)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_schema_endpoint_missing_form(self):
+        response = self.client.get(reverse('form-schema', kwargs={'form_id': 999999}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from walkup_law.walkup_law import db
+
+
+class HealthTests(APITestCase):
+
+    def test_health_needs_no_credentials(self):
+        response = self.client.get(reverse('health'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'default': True, 'cache': True})
+
+    def test_unreachable_cache_is_unhealthy(self):
+        with mock.patch.object(db.cache, 'get', return_value=None):
+            response = self.client.get(reverse('health'))
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.data['cache'])
+
+
+@override_settings(DATABASE_HEALTH_CHECK_INTERVAL=30)
+class CheckConnectionsTests(TestCase):
+
+    def test_connections_in_a_transaction_are_left_alone(self):
+        connection.ensure_connection()
+        with mock.patch.object(connection, 'is_usable') as is_usable:
+            db.check_connections()
+        is_usable.assert_not_called()
@@ -0,0 +1,68 @@
+from django.core.cache import cache as django_cache
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import resolve, reverse
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law.cache import bump_generation
+from walkup_law.walkup_law.decorators import READ_ONLY, WRITE, transaction_policy, versioned_condition
+
+
+@versioned_condition('channels', 'form:{form_id}')
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+def fake_list_view(request, form_id):
+    return Response(status=200, data={"users": User.objects.count()})
+
+
+class TestVersionedCondition(TestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.factory = RequestFactory()
+
+    def test_not_modified_runs_no_queries(self):
+        response = fake_list_view(self.factory.get('/fake/'), form_id=1)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = fake_list_view(self.factory.get('/fake/', HTTP_IF_NONE_MATCH=etag), form_id=1)
+        self.assertEqual(response.status_code, 304)
+
+    def test_bump_changes_etag(self):
+        etag = fake_list_view(self.factory.get('/fake/'), form_id=1)['ETag']
+        bump_generation('form:1')
+        response = fake_list_view(self.factory.get('/fake/', HTTP_IF_NONE_MATCH=etag), form_id=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Last-Modified', response)
+
+    def test_other_form_keeps_etag(self):
+        etag = fake_list_view(self.factory.get('/fake/'), form_id=1)['ETag']
+        bump_generation('form:2')
+        response = fake_list_view(self.factory.get('/fake/', HTTP_IF_NONE_MATCH=etag), form_id=1)
+        self.assertEqual(response.status_code, 304)
+
+
+def view_for(name, **kwargs):
+    return resolve(reverse(name, kwargs=kwargs or None)).func
+
+
+class TestTransactionPolicy(SimpleTestCase):
+
+    def test_every_app_view_declares_a_policy(self):
+        views = [view_for('cache-stats'), view_for('query-stats'), view_for('form-schema', form_id=1),
+                 view_for('submit-answers', case_id=1), view_for('attorney-caseload'),
+                 view_for('case-by-number', case_number=1), view_for('user-charges'),
+                 view_for('stripe-webhook'), view_for('token-auth-stats')]
+        for view in views:
+            self.assertIn(transaction_policy(view), (READ_ONLY, WRITE), view)
+
+    def test_policies_opt_out_of_atomic_requests(self):
+        for view, policy in ((view_for('case-by-number', case_number=1), READ_ONLY),
+                             (view_for('submit-answers', case_id=1), WRITE)):
+            self.assertEqual(transaction_policy(view), policy)
+            self.assertIn('default', view._non_atomic_requests)
@@ -0,0 +1,54 @@
+import random
+
+from django.test import TestCase
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law import fixtures
+from walkup_law.walkup_law.models import Case, Form, Question, QuestionGroup
+
+
+class TestFixtureGenerator(TestCase):
+
+    def test_counts_and_batches(self):
+        created = fixtures.create_fixtures(users=7, cases=25, forms=3, attorneys=4, seed=1, batch_size=4)
+        self.assertEqual(created['users'], 7)
+        self.assertEqual(User.objects.filter(username__startswith='fixture-1-').count(), 7)
+        self.assertEqual(Case.objects.count(), 25)
+        self.assertLessEqual(Case.objects.values('attorney').distinct().count(), 4)
+        self.assertEqual(Form.objects.count(), 3)
+        self.assertEqual(Question.objects.count(), created['questions'])
+        for form in Form.objects.all():
+            self.assertGreaterEqual(form.questiongroup_set.count(), 3)
+
+    def test_same_seed_same_rows(self):
+        def rows():
+            return [(user.name, user.stripe_customer_id, user.stripe_subscription_paid_through)
+                    for user in fixtures.generate_users(random.Random(5), 20, 5)]
+        self.assertEqual(rows(), rows())
+
+    def test_same_seed_twice_adds_nothing(self):
+        fixtures.create_fixtures(users=5, cases=4, forms=2, seed=3)
+        questions = Question.objects.count()
+        created = fixtures.create_fixtures(users=8, cases=6, forms=2, seed=3)
+        self.assertEqual(created, {'users': 3, 'cases': 2, 'questions': 0})
+        self.assertEqual(User.objects.filter(username__startswith='fixture-3-').count(), 8)
+        self.assertEqual(Case.objects.count(), 6)
+        self.assertEqual(Form.objects.count(), 2)
+        self.assertEqual(Question.objects.count(), questions)
+
+    def test_rerun_keeps_the_rows_it_would_have_made(self):
+        fixtures.create_fixtures(users=0, cases=3, forms=0, seed=2)
+        first = list(Case.objects.order_by('case_number').values_list('case_number', 'attorney', 'is_open'))
+        Case.objects.all().delete()
+        fixtures.create_fixtures(users=4, cases=3, forms=1, seed=2)
+        self.assertEqual(list(Case.objects.order_by('case_number').values_list('case_number', 'attorney', 'is_open')),
+                         first)
+        self.assertEqual(first[0][0], 2 * fixtures.CASES_PER_SEED + 1)
+
+    def test_seeds_do_not_collide(self):
+        fixtures.create_fixtures(users=2, cases=3, forms=1, seed=1)
+        created = fixtures.create_fixtures(users=2, cases=3, forms=1, seed=2)
+        self.assertEqual((created['users'], created['cases']), (2, 3))
+        self.assertEqual(Case.objects.count(), 6)
+        self.assertEqual(Form.objects.count(), 2)
+        self.assertEqual(QuestionGroup.objects.filter(form__isnull=True).count(), 0)
@@ -0,0 +1,64 @@
+from django.core.cache import cache as django_cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from walkup_law.users import models as UM
+from walkup_law.walkup_law.cache import flush_counters, get_counters
+from walkup_law.walkup_law.middleware import fingerprint, query_stats
+from walkup_law.walkup_law.models import Case
+
+
+class FingerprintTests(TestCase):
+
+    def test_in_lists_and_numbers_collapse(self):
+        short, _ = fingerprint('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21')
+        long, _ = fingerprint('SELECT *  FROM t WHERE id IN (%s, %s, %s, %s) LIMIT 5')
+        self.assertEqual(short, long)
+        other, _ = fingerprint('SELECT * FROM u WHERE id IN (%s, %s)')
+        self.assertNotEqual(short, other)
+
+
+@override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=1.0)
+class QueryInstrumentationTests(APITestCase):
+
+    def setUp(self):
+        flush_counters()
+        django_cache.clear()
+        Case.objects.create(case_number=42, attorney="Ortiz")
+        self.user = UM.User.objects.create(username="admin", is_staff=True)
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_and_counters(self):
+        response = self.client.get(reverse('case-by-number', kwargs={'case_number': 42}))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        stats = query_stats(['case-by-number'])['case-by-number']
+        self.assertEqual(stats['sampled_requests'], 1)
+        self.assertGreaterEqual(stats['queries_per_request'], 1)
+        self.assertEqual(stats['response_bytes_per_request'], len(response.content))
+
+        response = self.client.get(reverse('query-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('case-by-number', response.data)
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=3600)
+    def test_counters_are_buffered(self):
+        self.client.get(reverse('case-by-number', kwargs={'case_number': 42}))
+        self.assertEqual(get_counters(['queries:case-by-number:requests'])['queries:case-by-number:requests'], 0)
+        self.assertEqual(query_stats(['case-by-number'])['case-by-number']['sampled_requests'], 1)
+
+    @override_settings(DEBUG=False)
+    def test_server_timing_is_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('form-schema', kwargs={'form_id': 999999}))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(QUERY_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        response = self.client.get(reverse('case-by-number', kwargs={'case_number': 42}))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(query_stats(['case-by-number']), {})
@@ -0,0 +1,78 @@
+import datetime
+import unittest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law.pagination import KeysetPagination, decode_cursor, encode_cursor
+
+
+class TestCursorEncoding(unittest.TestCase):
+
+    def test_round_trip(self):
+        created = datetime.datetime(2018, 3, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        cursor = encode_cursor([created, "video1uuid"])
+        self.assertEqual(decode_cursor(cursor), [created.isoformat(), "video1uuid"])
+
+    def test_malformed_cursor(self):
+        self.assertIsNone(decode_cursor("not a cursor"))
+        self.assertIsNone(decode_cursor(encode_cursor([1])[:-1] + "{"))
+
+
+class UserKeysetView(object):
+    keyset_ordering = ('date_joined', 'id')
+
+
+class MixedOrderingView(object):
+    keyset_ordering = ('-date_joined', 'id')
+
+
+class TestKeysetPagination(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        joined = timezone.now()
+        # several users share a timestamp so the tie breaker on id is exercised
+        for i in range(7):
+            User.objects.create(username="user{}".format(i), date_joined=joined + datetime.timedelta(seconds=i // 3))
+
+    def paginate(self, url):
+        paginator = KeysetPagination()
+        request = Request(self.factory.get(url))
+        page = paginator.paginate_queryset(User.objects.all(), request, view=UserKeysetView())
+        return paginator, page
+
+    def test_walks_every_row_once(self):
+        seen = []
+        url = '/users/?limit=3&count=1'
+        while url:
+            paginator, page = self.paginate(url)
+            seen.extend(user.username for user in page)
+            url = paginator.get_next_link()
+            if len(seen) == 3:
+                self.assertEqual(paginator.count, 7)
+            else:
+                self.assertIsNone(paginator.count)
+        self.assertEqual(seen, ["user{}".format(i) for i in range(7)])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self.paginate('/users/?cursor=garbage')
+
+    def test_forged_cursor_of_wrong_types(self):
+        with self.assertRaises(NotFound):
+            self.paginate('/users/?cursor=' + encode_cursor([123, 1]))
+
+    def test_forged_cursor_of_nulls(self):
+        with self.assertRaises(NotFound):
+            self.paginate('/users/?cursor=' + encode_cursor([None, None]))
+
+    def test_mixed_ordering_is_rejected(self):
+        request = Request(self.factory.get('/users/'))
+        with self.assertRaises(ImproperlyConfigured):
+            KeysetPagination().paginate_queryset(User.objects.all(), request, view=MixedOrderingView())
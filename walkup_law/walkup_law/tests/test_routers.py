@@ -0,0 +1,112 @@
+import uuid
+from unittest import mock
+
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from walkup_law.users import models as UM
+from walkup_law.users.authentication import CachedTokenAuthentication
+from walkup_law.walkup_law import routers
+from walkup_law.walkup_law.middleware import client_key
+from walkup_law.walkup_law.models import Case, Form
+
+
+@override_settings(DATABASE_REPLICAS=['replica0', 'replica1'])
+class ReplicaRouterTests(TestCase):
+
+    def setUp(self):
+        routers.reset()
+        self.router = routers.ReplicaRouter()
+        patcher = mock.patch.object(routers, 'replica_is_healthy', side_effect=lambda alias: alias == 'replica1')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(routers.reset)
+
+    def read(self):
+        # TestCase wraps each test in a transaction, which keeps reads on the primary
+        with mock.patch.object(routers.connections['default'], 'in_atomic_block', False):
+            return self.router.db_for_read(Case)
+
+    def test_reads_outside_read_only_views_use_primary(self):
+        self.assertEqual(self.read(), 'default')
+
+    def test_read_only_reads_use_healthy_replica(self):
+        with routers.replica_reads():
+            self.assertEqual(self.read(), 'replica1')
+
+    def test_reads_after_write_use_primary(self):
+        with routers.replica_reads():
+            self.assertEqual(self.router.db_for_write(Case), 'default')
+            self.assertEqual(self.read(), 'default')
+
+    def test_pinned_client_uses_primary(self):
+        routers.pin_to_primary()
+        with routers.replica_reads():
+            self.assertEqual(self.read(), 'default')
+
+    def test_reads_in_transaction_use_primary(self):
+        with routers.replica_reads(), transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Case), 'default')
+
+    def test_falls_back_when_no_replica_is_healthy(self):
+        with mock.patch.object(routers, 'replica_is_healthy', return_value=False), routers.replica_reads():
+            self.assertEqual(self.read(), 'default')
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'walkup_law'))
+        self.assertFalse(self.router.allow_migrate('replica0', 'walkup_law'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica0'])
+class ReplicaPinningTests(APITestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        self.case = Case.objects.create(case_number=42, attorney="Ortiz")
+        token = Token.objects.create(user=UM.User.objects.create(username="attorney", is_staff=True))
+        self.authorization = 'Token ' + token.key
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+    def pinned(self):
+        request = mock.Mock(META={'HTTP_AUTHORIZATION': self.authorization}, COOKIES={})
+        return bool(django_cache.get(client_key(request)))
+
+    @mock.patch.object(routers, 'replica_is_healthy', return_value=True)
+    def test_only_writes_pin_client(self, healthy):
+        self.client.get(reverse('case-by-number', kwargs={'case_number': 42}))
+        self.assertFalse(self.pinned())
+
+        form = Form.objects.create(title="Empty intake")
+        response = self.client.post(reverse('submit-answers', kwargs={'case_id': self.case.pk}),
+                                    data={'client_submission_id': str(uuid.uuid4()), 'form': form.pk,
+                                          'answers': {}}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self.pinned())
+
+
+@override_settings(DATABASE_REPLICAS=['replica0'])
+class LoginPinningTests(APITransactionTestCase):
+
+    def setUp(self):
+        django_cache.clear()
+        routers.reset()
+        self.addCleanup(routers.reset)
+
+    def test_new_token_is_pinned_through_its_user(self):
+        user = UM.User.objects.create(username="client")
+        token = Token.objects.create(user=user)
+
+        CachedTokenAuthentication().authenticate_credentials(token.key)
+        self.assertTrue(routers._state.pinned)
+
+    def test_unpinned_user_reads_replicas(self):
+        user = UM.User.objects.create(username="client")
+        token = Token.objects.create(user=user)
+        django_cache.delete(routers.USER_PIN_KEY.format(user.pk))
+
+        CachedTokenAuthentication().authenticate_credentials(token.key)
+        self.assertFalse(getattr(routers._state, 'pinned', False))
@@ -0,0 +1,71 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from walkup_law.users.models import User
+from walkup_law.walkup_law.serializers import ValuesPlan, fast_list_data
+
+
+class FlatUserSerializer(serializers.ModelSerializer):
+    login = serializers.CharField(source='username')
+
+    class Meta:
+        model = User
+        fields = ('id', 'login', 'email', 'name', 'date_joined', 'is_staff', 'stripe_subscription_paid_through')
+
+
+class NestedUserSerializer(serializers.ModelSerializer):
+    initials = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ('id', 'initials')
+
+    def get_initials(self, obj):
+        return obj.username[:2]
+
+
+class PropertyUserSerializer(serializers.ModelSerializer):
+    full_name = serializers.CharField(source='get_full_name')
+
+    class Meta:
+        model = User
+        fields = ('id', 'full_name')
+
+
+class FileUserSerializer(serializers.ModelSerializer):
+    avatar = serializers.FileField(source='name')
+
+    class Meta:
+        model = User
+        fields = ('id', 'avatar')
+
+
+class TestValuesPlan(TestCase):
+
+    def setUp(self):
+        User.objects.create(username="anna", email="anna@example.com", stripe_subscription_paid_through=1520000000)
+        User.objects.create(username="ben", name="Ben", is_staff=True)
+
+    def test_output_is_byte_identical(self):
+        queryset = User.objects.order_by('id')
+        expected = JSONRenderer().render(FlatUserSerializer(queryset, many=True).data)
+        actual = JSONRenderer().render(fast_list_data(FlatUserSerializer, queryset))
+        self.assertEqual(actual, expected)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            fast_list_data(FlatUserSerializer, User.objects.all())
+
+    def test_rejects_computed_fields(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesPlan(NestedUserSerializer)
+
+    def test_rejects_non_concrete_fields(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesPlan(PropertyUserSerializer)
+
+    def test_rejects_file_fields(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesPlan(FileUserSerializer)
@@ -1,7 +1,13 @@
 from django.conf.urls import url
 
+from walkup_law.walkup_law import views
 
 urlpatterns = [
-
-
+    url(r'^health/$', views.health, name='health'),
+    url(r'^cache-stats/$', views.cache_stats, name='cache-stats'),
+    url(r'^query-stats/$', views.query_stats, name='query-stats'),
+    url(r'^forms/(?P<form_id>\d+)/schema/$', views.form_schema, name='form-schema'),
+    url(r'^cases/(?P<case_id>\d+)/submissions/$', views.submit_answers, name='submit-answers'),
+    url(r'^cases/caseload/$', views.attorney_caseload, name='attorney-caseload'),
+    url(r'^cases/number/(?P<case_number>\d+)/$', views.case_by_number, name='case-by-number'),
 ]
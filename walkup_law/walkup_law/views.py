@@ -0,0 +1,141 @@
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+
+from walkup_law.walkup_law import answers, cache, cases, compiler, db
+from walkup_law.walkup_law.decorators import read_only, versioned_condition, write
+from walkup_law.walkup_law.middleware import query_stats as collect_query_stats
+from walkup_law.walkup_law.models import Form
+from walkup_law.walkup_law.serializers import CaseSerializer, SubmissionInputSerializer
+
+
+@read_only
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def health(request):
+    """
+    Liveness of every database connection and the cache, for load balancer
+    and compose health checks
+    :param request:
+    :return: 200 when everything answers, else 503
+    """
+    checks = db.database_health()
+    return Response(status=200 if all(checks.values()) else 503, data=checks)
+
+
+@read_only
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """
+    Hit/miss counters of the read-through cache, used to size Redis
+    :param request: optional repeated ?namespace= to report on
+    :return:
+    """
+    namespaces = request.query_params.getlist('namespace') or cache.CATALOG_NAMESPACES
+    return Response(status=200, data=cache.cache_stats(namespaces))
+
+
+@read_only
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def query_stats(request):
+    """
+    Per-endpoint query counts, SQL time, duplicate queries and response size
+    averaged over sampled requests
+    :param request: optional repeated ?url_name= to report on
+    :return:
+    """
+    url_names = request.query_params.getlist('url_name') or None
+    return Response(status=200, data=collect_query_stats(url_names))
+
+
+@read_only
+@versioned_condition(compiler.FORM_NAMESPACE)
+@api_view(["GET"])
+def form_schema(request, form_id):
+    """
+    Compiled schema of an intake form with its ordered groups and questions
+    :param request:
+    :param form_id: primary key of the Form
+    :return:
+    """
+    try:
+        schema = compiler.get_compiled_schema(int(form_id))
+    except Form.DoesNotExist:
+        return Response(status=404)
+    return Response(status=200, data=schema)
+
+
+@write
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def submit_answers(request, case_id):
+    """
+    Store a whole form response for a case. Retrying with the same
+    client_submission_id returns the original submission with status 200.
+    Cases have no client of their own yet, so only staff may submit
+    :param request: {"client_submission_id": uuid, "form": id, "answers": {question id: answer}}
+    :param case_id: primary key of the Case
+    :return:
+    """
+    serializer = SubmissionInputSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(status=400, data=serializer.errors)
+    data = serializer.validated_data
+    try:
+        submission, created = answers.submit_answers(
+            case_id=int(case_id),
+            form_id=data['form'],
+            client_submission_id=data['client_submission_id'],
+            answers=data['answers'],
+        )
+    except Form.DoesNotExist:
+        return Response(status=400, data={'form': "form does not exist"})
+    except answers.SubmissionError as e:
+        return Response(status=400, data=e.errors)
+    return Response(status=201 if created else 200, data={
+        'submission': submission.pk,
+        'client_submission_id': str(submission.client_submission_id),
+        'form_version': submission.form_version,
+    })
+
+
+@read_only
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def attorney_caseload(request):
+    """
+    Counts plus one page of an attorney's cases
+    :param request: ?attorney=<name>&status=open|closed|all&limit=&offset=
+    :return:
+    """
+    attorney = request.query_params.get('attorney')
+    status = request.query_params.get('status', 'open')
+    if not attorney or status not in cases.STATUS_FILTERS:
+        return Response(status=400, data={'detail': "attorney and a status of open, closed or all are required"})
+    try:
+        limit = min(int(request.query_params.get('limit', 25)), 500)
+        offset = int(request.query_params.get('offset', 0))
+    except ValueError:
+        return Response(status=400, data={'detail': "limit and offset must be integers"})
+    if limit <= 0 or offset < 0:
+        return Response(status=400, data={'detail': "limit must be positive and offset not negative"})
+    return Response(status=200, data=cases.attorney_caseload(attorney, status, limit, offset))
+
+
+@read_only
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def case_by_number(request, case_number):
+    """
+    Look a case up by its docket number
+    :param request:
+    :param case_number:
+    :return:
+    """
+    case = cases.get_case_by_number(int(case_number))
+    if case is None:
+        return Response(status=404)
+    return Response(status=200, data=CaseSerializer(case).data)